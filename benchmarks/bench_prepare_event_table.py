@@ -0,0 +1,92 @@
+"""Compare the eager step-by-step event table with the single lazy plan.
+
+Each variant runs in a fresh process so that peak resident memory is not
+shared between them.
+
+    uv run python benchmarks/bench_prepare_event_table.py --rows 50_000_000
+"""
+
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+import numpy as np
+import polars as pl
+
+from polarstate.aj import (
+    add_at_risk_column,
+    add_cause_specific_hazards_columns,
+    add_events_at_times_column,
+    add_overall_survival_column,
+    add_previous_overal_survival_column,
+    add_state_occupancy_probabilities_at_times_columns,
+    add_transition_probabilities_at_times_columns,
+    group_reals_by_times,
+    prepare_event_table,
+)
+
+
+def make_times_and_reals(rows: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame(
+        {
+            "times": rng.exponential(10.0, rows),
+            "reals": rng.integers(0, 3, rows),
+        }
+    )
+
+
+def eager_event_table(times_and_reals: pl.DataFrame) -> pl.DataFrame:
+    return (
+        times_and_reals.pipe(group_reals_by_times)
+        .pipe(add_events_at_times_column)
+        .pipe(add_at_risk_column)
+        .pipe(add_cause_specific_hazards_columns)
+        .pipe(add_overall_survival_column)
+        .pipe(add_previous_overal_survival_column)
+        .pipe(add_transition_probabilities_at_times_columns)
+        .pipe(add_state_occupancy_probabilities_at_times_columns)
+    )
+
+
+VARIANTS = {
+    "eager": eager_event_table,
+    "lazy": prepare_event_table,
+}
+
+
+def _max_rss_bytes() -> int:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _run(variant: str, rows: int, queue) -> None:
+    times_and_reals = make_times_and_reals(rows)
+    rss_before = _max_rss_bytes()
+    start = time.perf_counter()
+    VARIANTS[variant](times_and_reals)
+    wall_time = time.perf_counter() - start
+    queue.put((wall_time, _max_rss_bytes() - rss_before))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    for variant in VARIANTS:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run, args=(variant, args.rows, queue))
+        process.start()
+        wall_time, peak_delta = queue.get()
+        process.join()
+        print(
+            f"{variant:>6}: {wall_time:8.3f} s, "
+            f"peak memory +{peak_delta / 2**20:10.1f} MiB ({args.rows:,} rows)"
+        )
+
+
+if __name__ == "__main__":
+    main()
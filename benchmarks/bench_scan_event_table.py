@@ -0,0 +1,71 @@
+"""Check that out-of-core event tables keep peak memory bounded.
+
+Writes ``--files`` Parquet files of ``--rows`` rows in total (only one file
+is held in memory at a time), then builds the event table from a glob over
+them in a fresh process and reports its peak resident memory next to the
+on-disk and in-memory size of the data.
+
+    uv run python benchmarks/bench_scan_event_table.py --rows 400_000_000
+"""
+
+import argparse
+import multiprocessing as mp
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from polarstate.scan import scan_event_table
+
+
+def write_files(directory: Path, rows: int, files: int, unique_times: int) -> None:
+    rng = np.random.default_rng(0)
+    for index in range(files):
+        chunk_rows = rows // files
+        pl.DataFrame(
+            {
+                "times": rng.integers(1, unique_times + 1, chunk_rows),
+                "reals": rng.integers(0, 3, chunk_rows, dtype=np.int8),
+            }
+        ).write_parquet(directory / f"part-{index:04d}.parquet")
+
+
+def _run(glob: str, queue) -> None:
+    start = time.perf_counter()
+    event_table = scan_event_table(glob)
+    wall_time = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put((wall_time, peak_rss, event_table.height))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--unique-times", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_files(Path(directory), args.rows, args.files, args.unique_times)
+        on_disk = sum(path.stat().st_size for path in Path(directory).iterdir())
+
+        ctx = mp.get_context("spawn")
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run, args=(f"{directory}/*.parquet", queue))
+        process.start()
+        wall_time, peak_rss, unique_times = queue.get()
+        process.join()
+
+    in_memory = args.rows * (8 + 1)
+    print(f"rows:             {args.rows:,} ({unique_times:,} unique times)")
+    print(f"on disk:          {on_disk / 2**20:10.1f} MiB")
+    print(f"in memory:        {in_memory / 2**20:10.1f} MiB")
+    print(f"peak process RSS: {peak_rss / 2**20:10.1f} MiB")
+    print(f"wall time:        {wall_time:10.3f} s")
+
+
+if __name__ == "__main__":
+    main()
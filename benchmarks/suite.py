@@ -0,0 +1,286 @@
+"""Time and memory-profile the Aalen-Johansen pipeline across data shapes.
+
+Every case runs in a fresh process so that its peak resident memory is not
+shared with other cases. Results are appended as JSON lines, one record per
+case, so runs of different releases can be compared:
+
+    uv run python benchmarks/suite.py run --sizes 1e3 1e5 1e7 -o results.jsonl
+    uv run python benchmarks/suite.py compare baseline.jsonl results.jsonl
+
+lifelines' ``AalenJohansenFitter`` is timed as a reference baseline for
+inputs up to ``--lifelines-max-rows`` rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import resource
+import statistics
+import time
+import warnings
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+import polars as pl
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.aj import (
+    add_at_risk_column,
+    add_cause_specific_hazards_columns,
+    add_events_at_times_column,
+    add_overall_survival_column,
+    add_previous_overal_survival_column,
+    add_state_occupancy_probabilities_at_times_columns,
+    add_transition_probabilities_at_times_columns,
+    group_reals_by_times,
+)
+
+# Data shapes: how observed times are drawn for a given number of rows.
+SHAPES = {
+    # Continuous times, almost every row is a unique time.
+    "continuous": lambda rng, rows: rng.exponential(365.0, rows),
+    # Daily resolution over ten years.
+    "daily": lambda rng, rows: rng.integers(1, 3651, rows),
+    # Ten distinct times, so every time is heavily tied.
+    "heavy_ties": lambda rng, rows: rng.integers(1, 11, rows),
+}
+
+HORIZONS = {"few": 5, "many": 10_000}
+
+STAGES = [
+    ("group_reals_by_times", group_reals_by_times),
+    ("add_events_at_times_column", add_events_at_times_column),
+    ("add_at_risk_column", add_at_risk_column),
+    ("add_cause_specific_hazards_columns", add_cause_specific_hazards_columns),
+    ("add_overall_survival_column", add_overall_survival_column),
+    ("add_previous_overal_survival_column", add_previous_overal_survival_column),
+    (
+        "add_transition_probabilities_at_times_columns",
+        add_transition_probabilities_at_times_columns,
+    ),
+    (
+        "add_state_occupancy_probabilities_at_times_columns",
+        add_state_occupancy_probabilities_at_times_columns,
+    ),
+]
+
+
+def make_times_and_reals(shape: str, rows: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame(
+        {"times": SHAPES[shape](rng, rows), "reals": rng.integers(0, 3, rows)}
+    )
+
+
+def make_horizons(times_and_reals: pl.DataFrame, horizons: str) -> pl.Series:
+    times = times_and_reals.get_column("times")
+    return pl.Series(
+        "times",
+        np.linspace(times.min(), times.max(), HORIZONS[horizons]),
+    ).cast(times.dtype)
+
+
+def build_case(case: str, shape: str, rows: int, horizons: str):
+    """Prepare the inputs of ``case`` and return the callable to time."""
+
+    times_and_reals = make_times_and_reals(shape, rows)
+
+    if case == "prepare_event_table":
+        return lambda: prepare_event_table(times_and_reals)
+
+    if case.startswith("predict_aj_estimates"):
+        event_table = prepare_event_table(times_and_reals)
+        fixed_time_horizons = make_horizons(times_and_reals, horizons)
+        full_event_table = case.endswith("full_event_table")
+        return lambda: predict_aj_estimates(
+            event_table, fixed_time_horizons, full_event_table=full_event_table
+        )
+
+    if case == "lifelines":
+        import pandas as pd
+        from lifelines import AalenJohansenFitter
+
+        durations = pd.Series(times_and_reals.get_column("times").to_numpy())
+        events = pd.Series(times_and_reals.get_column("reals").to_numpy())
+
+        def fit():
+            with warnings.catch_warnings():
+                # lifelines warns when it jitters tied event times.
+                warnings.simplefilter("ignore")
+                AalenJohansenFitter(calculate_variance=False).fit(
+                    durations, events, event_of_interest=1
+                )
+
+        return fit
+
+    # A single add_* stage, timed on the output of the stages before it.
+    frame = times_and_reals
+    for name, stage in STAGES:
+        if name == case:
+            return lambda: stage(frame)
+        frame = stage(frame)
+
+    raise ValueError(f"Unknown case {case!r}.")
+
+
+def _run_case(case, shape, rows, horizons, repeats, queue) -> None:
+    func = build_case(case, shape, rows, horizons)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    wall_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        wall_times.append(time.perf_counter() - start)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put((wall_times, peak_rss - rss_before))
+
+
+def _package_version(package: str) -> str | None:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def run(args: argparse.Namespace) -> None:
+    cases = [
+        "prepare_event_table",
+        *(name for name, _ in STAGES),
+        "predict_aj_estimates",
+        "predict_aj_estimates_full_event_table",
+    ]
+    environment = {
+        "polarstate": _package_version("polarstate"),
+        "polars": pl.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": mp.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    lifelines_available = _package_version("lifelines") is not None
+
+    ctx = mp.get_context("spawn")
+    with open(args.output, "a") as output:
+        for rows in (int(float(size)) for size in args.sizes):
+            for shape in args.shapes:
+                for case in cases + ["lifelines"]:
+                    if case == "lifelines" and not (
+                        lifelines_available and rows <= args.lifelines_max_rows
+                    ):
+                        continue
+                    for horizons in (
+                        args.horizons if case.startswith("predict") else [None]
+                    ):
+                        queue = ctx.Queue()
+                        process = ctx.Process(
+                            target=_run_case,
+                            args=(case, shape, rows, horizons, args.repeats, queue),
+                        )
+                        process.start()
+                        wall_times, peak_rss_delta = queue.get()
+                        process.join()
+
+                        record = {
+                            "case": case,
+                            "rows": rows,
+                            "shape": shape,
+                            "horizons": horizons,
+                            "repeats": args.repeats,
+                            "wall_time_min_s": min(wall_times),
+                            "wall_time_median_s": statistics.median(wall_times),
+                            "peak_rss_delta_bytes": peak_rss_delta,
+                            **environment,
+                        }
+                        output.write(json.dumps(record) + "\n")
+                        output.flush()
+                        print(
+                            f"{case:>50} {shape:>10} {rows:>12,} "
+                            f"{horizons or '':>5} {min(wall_times):10.4f} s "
+                            f"{peak_rss_delta / 2**20:10.1f} MiB"
+                        )
+
+
+def compare(args: argparse.Namespace) -> None:
+    key = ("case", "rows", "shape", "horizons")
+    baseline = (
+        pl.read_ndjson(args.baseline)
+        .group_by(key)
+        .agg(pl.col("wall_time_min_s", "peak_rss_delta_bytes").min())
+    )
+    candidate = (
+        pl.read_ndjson(args.candidate)
+        .group_by(key)
+        .agg(pl.col("wall_time_min_s", "peak_rss_delta_bytes").min())
+    )
+    comparison = (
+        baseline.join(candidate, on=key, suffix="_candidate", nulls_equal=True)
+        .with_columns(
+            (pl.col("wall_time_min_s_candidate") / pl.col("wall_time_min_s")).alias(
+                "time_ratio"
+            ),
+            (
+                pl.col("peak_rss_delta_bytes_candidate")
+                / pl.col("peak_rss_delta_bytes")
+            ).alias("memory_ratio"),
+        )
+        .sort(key)
+    )
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200):
+        print(
+            comparison.select(
+                *key,
+                "wall_time_min_s",
+                "wall_time_min_s_candidate",
+                "time_ratio",
+                "memory_ratio",
+            )
+        )
+    regressions = comparison.filter(pl.col("time_ratio") > args.threshold)
+    if regressions.height:
+        raise SystemExit(f"{regressions.height} case(s) slower than {args.threshold}x.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark cases.")
+    run_parser.add_argument(
+        "--sizes", nargs="+", default=["1e3", "1e4", "1e5", "1e6"], metavar="ROWS"
+    )
+    run_parser.add_argument(
+        "--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES)
+    )
+    run_parser.add_argument(
+        "--horizons", nargs="+", default=list(HORIZONS), choices=list(HORIZONS)
+    )
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--lifelines-max-rows", type=int, default=100_000)
+    run_parser.add_argument("-o", "--output", default="benchmark_results.jsonl")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare two result files case by case."
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Exit with an error when a case is this many times slower.",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,48 @@
 """Public API for the :mod:`polarstate` package."""
 
 from .aj import prepare_event_table
+from .bootstrap import bootstrap_aj_estimates
+from .calibration import calibration_curve
+from .cli import main  # noqa: F401  (console script entry point)
+from .compare import grays_test, risk_differences
+from .counts import EventCounts
+from .decision import net_benefit
+from .dtypes import EventTableDtypes
+from .event_table import EventTable
+from .inputs import as_times_and_reals
+from .instrument import StageRecorder
+from .io import load_event_table, save_event_table
+from .metrics import brier_score, time_dependent_auc
+from .multistate import prepare_multistate_table
+from .namespace import AalenJohansenExpr, AalenJohansenFrame, AalenJohansenLazyFrame
 from .predict import predict_aj_estimates
+from .pseudo import pseudo_observations
+from .restricted_mean import restricted_mean_time
+from .scan import scan_event_counts, scan_event_table
 
-__all__ = ["prepare_event_table", "predict_aj_estimates"]
-
-
-def main() -> None:
-    print("Hello from polarstate!")
+__all__ = [
+    "AalenJohansenExpr",
+    "AalenJohansenFrame",
+    "AalenJohansenLazyFrame",
+    "EventCounts",
+    "EventTable",
+    "EventTableDtypes",
+    "StageRecorder",
+    "as_times_and_reals",
+    "bootstrap_aj_estimates",
+    "brier_score",
+    "calibration_curve",
+    "grays_test",
+    "load_event_table",
+    "net_benefit",
+    "predict_aj_estimates",
+    "prepare_event_table",
+    "prepare_multistate_table",
+    "pseudo_observations",
+    "restricted_mean_time",
+    "risk_differences",
+    "save_event_table",
+    "scan_event_counts",
+    "scan_event_table",
+    "time_dependent_auc",
+]
@@ -1,233 +1,874 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from typing import Any, Literal, TypeVar, Union
+
+import numpy as np
 import polars as pl
 
+from .dtypes import EventTableDtypes
+from .inputs import as_times_and_reals
+from .instrument import run_stage
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+By = Union[str, Sequence[str], None]
+Causes = Union[Sequence[int], pl.Enum, Literal["infer"], None]
+TimeGrid = Union[Sequence[float], pl.Series, int, None]
+
+_COUNT_COLUMN = re.compile(r"^count_(\d+)$")
+_OCCUPANCY_COLUMN = re.compile(r"^state_occupancy_probability_(\d+)_at_times$")
+
+# Sorted inputs averaging more rows per unique time than this are counted
+# faster by Polars' multi-threaded hash aggregation than by a run-length pass.
+_MAX_ROWS_PER_RUN = 1024
+# Largest range of event-type codes mapped to count cells by a lookup table.
+_MAX_LOOKUP_SIZE = 1 << 16
+
+
+def _by_columns(by: By) -> list[str]:
+    if by is None:
+        return []
+    if isinstance(by, str):
+        return [by]
+    return list(by)
+
+
+def _over(expr: pl.Expr, by: By) -> pl.Expr:
+    by = _by_columns(by)
+    return expr.over(by) if by else expr
+
+
+def _causes(frame: pl.DataFrame | pl.LazyFrame) -> list[int]:
+    """Causes (event types other than censoring) present as ``count_k`` columns."""
+    return sorted(
+        int(match.group(1))
+        for match in map(_COUNT_COLUMN.match, frame.collect_schema().names())
+        if match and match.group(1) != "0"
+    )
+
+
+def _occupied_states(event_table: pl.DataFrame | pl.LazyFrame) -> list[int]:
+    """Absorbing states with ``state_occupancy_probability_k_at_times`` columns."""
+    return sorted(
+        int(match.group(1))
+        for match in map(_OCCUPANCY_COLUMN.match, event_table.collect_schema().names())
+        if match
+    )
+
 
 def create_sorted_times_and_reals_data(times: pl.Series, reals: pl.Series):
-    return pl.DataFrame({"times": times, "reals": reals}).sort("times")
+    times_and_reals = pl.DataFrame({"times": times, "reals": reals})
+    if times_and_reals.get_column("times").is_sorted():
+        return times_and_reals
+    return times_and_reals.sort("times")
 
 
-def add_events_at_times_column(sorted_times_and_reals: pl.DataFrame):
+def add_events_at_times_column(sorted_times_and_reals: FrameT) -> FrameT:
+    counts = [
+        "count_0",
+        *(f"count_{cause}" for cause in _causes(sorted_times_and_reals)),
+    ]
     return sorted_times_and_reals.with_columns(
-        (pl.col("count_0") + pl.col("count_1") + pl.col("count_2")).alias(
-            "events_at_times"
-        )
+        pl.sum_horizontal(counts).alias("events_at_times")
     )
 
 
-def group_reals_by_times(df: pl.DataFrame) -> pl.DataFrame:
+def group_reals_by_times(
+    df: FrameT,
+    by: By = None,
+    weights: str | None = None,
+    causes: Causes = None,
+    assume_sorted: bool = False,
+) -> FrameT:
     """
-    Count occurrences of each event type (0, 1, 2) per unique observed time.
+    Count occurrences of each event type (0, 1, 2, ...) per unique observed time.
 
     Parameters
     ----------
-    df : pl.DataFrame
-        A Polars DataFrame with at least two columns:
+    df : pl.DataFrame or pl.LazyFrame
+        A Polars frame with at least two columns:
         - 'times' (int): The observed time for each record.
         - 'reals' (int): The event type for each record, where:
             - 0 indicates censoring,
             - 1 indicates the primary event,
-            - 2 indicates a competing event.
+            - 2 indicates a competing event,
+            - further integers indicate further competing causes.
+    by : str or sequence of str, optional
+        Stratum columns. Counts are computed per stratum and unique time.
+    weights : str, optional
+        Column of case weights. Counts become the (Float64) sums of the weights
+        instead of numbers of rows, so pre-aggregated ``(times, reals, n)``
+        rows or inverse-probability weights need not be expanded.
+    causes : sequence of int, pl.Enum or "infer", optional
+        The competing causes to count. Defaults to ``(1, 2)``. ``"infer"``
+        discovers them from the data. A ``pl.Enum`` maps labelled ``reals``
+        to codes by category position, with the first category meaning
+        censoring and the others causes ``1..K``.
+    assume_sorted : bool
+        Whether ``df`` is already sorted by ``by`` and ``times``. A sorted
+        ``pl.DataFrame`` with many unique times is counted in a single
+        run-length pass instead of a hash aggregation. Without ``by`` the
+        sort order is also detected. Ignored for a ``pl.LazyFrame``.
 
     Returns
     -------
-    pl.DataFrame
-        A DataFrame with one row per unique time and three additional columns:
+    pl.DataFrame or pl.LazyFrame
+        A frame of the same kind with one row per unique time and one count
+        column per event type:
         - 'count_0': Number of censored observations at that time.
-        - 'count_1': Number of primary events at that time.
-        - 'count_2': Number of competing events at that time.
+        - 'count_k': Number of events of cause k at that time.
 
     Notes
     -----
     - Input is assumed to be clean (i.e., `times` and `reals` are properly typed).
-    - Times are sorted in ascending order in the output.
+    - Times are sorted in ascending order (within each stratum) in the output.
     - If a particular event type does not occur at a time, its count will be 0.
+    - All causes are counted in a single aggregation over the raw rows. With
+      ``causes="infer"`` the rows are grouped by time and event type instead,
+      and the small long table is collected to discover the causes.
     """
+    keys = [*_by_columns(by), "times"]
+
+    if isinstance(causes, pl.Enum):
+        df = df.with_columns(pl.col("reals").cast(causes).to_physical())
+        causes = range(1, len(causes.categories))
+
+    if isinstance(causes, str) and causes != "infer":
+        raise ValueError("causes must be a sequence, a pl.Enum or 'infer'.")
+
+    if (
+        isinstance(df, pl.DataFrame)
+        and _run_length_countable(df, weights)
+        and (
+            assume_sorted or (keys == ["times"] and df.get_column("times").is_sorted())
+        )
+    ):
+        starts = _run_starts(df, keys)
+        n_runs = int(starts.sum())
+        if n_runs and n_runs * _MAX_ROWS_PER_RUN >= df.height:
+            if causes == "infer":
+                causes = sorted(
+                    real for real in df.get_column("reals").unique() if real
+                )
+            return _group_sorted_reals_by_times(
+                df, keys, starts, weights, causes or (1, 2)
+            )
+
+    if isinstance(df, pl.DataFrame):
+        return group_reals_by_times(df.lazy(), by, weights, causes).collect(
+            engine="streaming"
+        )
+
+    if causes == "infer":
+        return _group_reals_by_times_inferring_causes(df, keys, weights)
+
+    if causes is None:
+        causes = (1, 2)
+
+    def count(real: int) -> pl.Expr:
+        if weights is None:
+            return (pl.col("reals") == real).sum().cast(pl.Int64)
+        return pl.col(weights).filter(pl.col("reals") == real).sum().cast(pl.Float64)
+
     return (
-        df.group_by("times")
+        df.group_by(keys)
+        .agg([count(real).alias(f"count_{real}") for real in (0, *causes)])
+        .sort(keys)
+    )
+
+
+def _run_length_countable(df: pl.DataFrame, weights: str | None) -> bool:
+    """Whether ``reals`` are integers and ``reals`` and weights have no nulls."""
+    columns = ["reals"] if weights is None else ["reals", weights]
+    return (
+        df.schema["reals"].is_integer()
+        and (weights is None or df.schema[weights].is_numeric())
+        and not any(df.get_column(column).has_nulls() for column in columns)
+    )
+
+
+def _run_starts(df: pl.DataFrame, keys: list[str]) -> np.ndarray:
+    """Boolean mask of the rows whose keys differ from the previous row's."""
+    return (
+        df.select(
+            # Nulls in stratum columns equal each other, as in group_by.
+            pl.any_horizontal(
+                pl.int_range(pl.len()) == 0,
+                *(pl.col(key).ne_missing(pl.col(key).shift(1)) for key in keys),
+            ).alias("starts")
+        )
+        .get_column("starts")
+        .to_numpy()
+    )
+
+
+def _group_sorted_reals_by_times(
+    df: pl.DataFrame,
+    keys: list[str],
+    starts: np.ndarray,
+    weights: str | None,
+    causes: Sequence[int],
+) -> pl.DataFrame:
+    # Rows with equal keys are contiguous, so every run of them is one output
+    # row and a single bincount over (run, event type) cells counts them all.
+    reals = [0, *causes]
+    n_cells = len(reals) + 1
+    cells = np.cumsum(starts, dtype=np.int64) - 1
+    n_runs = int(cells[-1]) + 1
+    cells *= n_cells
+
+    # Event types other than censoring and the causes go to the last cell.
+    values = df.get_column("reals").to_numpy()
+    low = min(int(values.min()), *reals)
+    high = max(int(values.max()), *reals)
+    if high - low < _MAX_LOOKUP_SIZE:
+        lookup = np.full(high - low + 1, len(reals))
+        lookup[np.asarray(reals) - low] = np.arange(len(reals))
+        cells += lookup[values - low]
+    else:
+        order = np.argsort(reals)
+        sorted_reals = np.asarray(reals)[order]
+        position = np.searchsorted(sorted_reals, values).clip(max=len(reals) - 1)
+        cells += np.where(sorted_reals[position] == values, order[position], len(reals))
+
+    counts = np.bincount(
+        cells,
+        weights=None if weights is None else df.get_column(weights).to_numpy(),
+        minlength=n_runs * n_cells,
+    ).reshape(n_runs, n_cells)
+
+    dtype = pl.Int64 if weights is None else pl.Float64
+    return (
+        df.select(keys)
+        .filter(pl.Series(starts))
+        .with_columns(
+            pl.Series(f"count_{real}", counts[:, i], dtype=dtype)
+            for i, real in enumerate(reals)
+        )
+    )
+
+
+def _group_reals_by_times_inferring_causes(
+    df: FrameT, keys: list[str], weights: str | None
+) -> FrameT:
+    # Raw rows are grouped once by time and event type; the causes are read
+    # off that much smaller long table, which is then spread into one
+    # count_k column per cause.
+    long_counts = df.group_by([*keys, "reals"]).agg(
+        (pl.len() if weights is None else pl.col(weights).sum()).alias("count")
+    )
+    if isinstance(long_counts, pl.LazyFrame):
+        long_counts = long_counts.collect().lazy()
+    found = long_counts.lazy().select(pl.col("reals").unique()).collect()
+    causes = sorted(real for real in found.get_column("reals") if real != 0)
+
+    dtype = pl.Int64 if weights is None else pl.Float64
+    return (
+        long_counts.group_by(keys)
         .agg(
             [
-                (pl.col("reals") == 0).sum().cast(pl.Int64).alias("count_0"),
-                (pl.col("reals") == 1).sum().cast(pl.Int64).alias("count_1"),
-                (pl.col("reals") == 2).sum().cast(pl.Int64).alias("count_2"),
+                pl.col("count")
+                .filter(pl.col("reals") == real)
+                .sum()
+                .cast(dtype)
+                .alias(f"count_{real}")
+                for real in (0, *causes)
             ]
         )
-        .sort("times")
+        .sort(keys)
     )
 
 
-def add_at_risk_column(events_data: pl.DataFrame) -> pl.DataFrame:
+def add_at_risk_column(events_data: FrameT, by: By = None) -> FrameT:
     """
     Add a column to the DataFrame that counts the number of individuals at risk at each time point.
 
     Parameters
     ----------
-    events_data : pl.DataFrame
-        A DataFrame with columns 'times', 'count_0', 'count_1', and 'count_2'.
+    events_data : pl.DataFrame or pl.LazyFrame
+        A DataFrame with columns 'times' and 'events_at_times', and optionally
+        'entered_before_times' (see :func:`add_entered_before_times_column`).
+    by : str or sequence of str, optional
+        Stratum columns. The frame must be sorted by ``by`` and ``times``.
 
     Returns
     -------
-    pl.DataFrame
-        The input DataFrame with an additional column 'at_risk' that contains the number of individuals at risk at each time point.
+    pl.DataFrame or pl.LazyFrame
+        The input frame with an additional column 'at_risk' that contains the number of individuals at risk at each time point.
+        Without delayed entry everyone is at risk from time zero, so this is the
+        number of exits at or after each time. With 'entered_before_times' it is
+        the number of entries before each time minus the number of exits before it.
     """
+    if "entered_before_times" not in events_data.collect_schema().names():
+        return events_data.with_columns(
+            _over(pl.col("events_at_times").cum_sum(reverse=True), by).alias("at_risk")
+        )
+
+    exited_before_times = pl.col("events_at_times").cum_sum() - pl.col(
+        "events_at_times"
+    )
     return events_data.with_columns(
-        pl.col("events_at_times").cum_sum(reverse=True).alias("at_risk")
+        (pl.col("entered_before_times") - _over(exited_before_times, by)).alias(
+            "at_risk"
+        )
+    )
+
+
+def add_entered_before_times_column(
+    events_data: FrameT,
+    times_and_reals: FrameT,
+    entry_times: str,
+    by: By = None,
+    weights: str | None = None,
+) -> FrameT:
+    """
+    Add the number of individuals who entered observation strictly before each time.
+
+    Entries are counted per unique entry time and merged onto the event times
+    with a single backward ``join_asof``, so delayed entry costs one sort of
+    the entry times instead of a cross join of individuals and times.
+
+    Parameters
+    ----------
+    events_data : pl.DataFrame or pl.LazyFrame
+        The output of :func:`group_reals_by_times`, sorted by ``by`` and ``times``.
+    times_and_reals : pl.DataFrame or pl.LazyFrame
+        The raw data with an entry-time column. Individuals are at risk at time
+        t when their entry time is before t and their observed time is at or
+        after t.
+    entry_times : str
+        Column of entry times.
+    by : str or sequence of str, optional
+        Stratum columns.
+    weights : str, optional
+        Column of case weights.
+
+    Returns
+    -------
+    pl.DataFrame or pl.LazyFrame
+        The input frame with an additional column 'entered_before_times'.
+    """
+    by = _by_columns(by)
+    times_dtype = events_data.collect_schema()["times"]
+    entered = (
+        times_and_reals.group_by([*by, pl.col(entry_times).cast(times_dtype)])
+        .agg((pl.len() if weights is None else pl.col(weights).sum()).alias("entered"))
+        .sort([*by, entry_times])
+        .select(
+            *by,
+            pl.col(entry_times),
+            _over(pl.col("entered").cum_sum(), by).alias("entered_before_times"),
+        )
+    )
+    joined = events_data.join_asof(
+        entered,
+        left_on="times",
+        right_on=entry_times,
+        by=by or None,
+        allow_exact_matches=False,
+        check_sortedness=not by,
+    )
+    dtype = events_data.collect_schema()["count_0"]
+    return joined.drop(entry_times).with_columns(
+        pl.col("entered_before_times").fill_null(0).cast(dtype)
     )
 
 
-def add_cause_specific_hazards_columns(events_data: pl.DataFrame) -> pl.DataFrame:
+def add_cause_specific_hazards_columns(events_data: FrameT) -> FrameT:
     """
     Add columns for cause-specific hazards and conditional survival at each time point.
 
     Parameters
     ----------
-    events_data : pl.DataFrame
+    events_data : pl.DataFrame or pl.LazyFrame
         A DataFrame with columns:
-        - 'count_0': number of censored individuals at each time point,
-        - 'count_1': number of primary events at each time point,
-        - 'count_2': number of competing events at each time point,
+        - 'count_k': number of events of cause k at each time point,
         - 'at_risk': number of individuals at risk at each time point.
 
     Returns
     -------
-    pl.DataFrame
-        The input DataFrame with three additional columns:
-        - 'csh_1': cause-specific hazard for event type 1 (count_1 / at_risk)
-        - 'csh_2': cause-specific hazard for event type 2 (count_2 / at_risk)
-        - 'conditional_survival': probability of not having any event at that time (count_0 / at_risk)
+    pl.DataFrame or pl.LazyFrame
+        The input frame with additional columns:
+        - 'csh_k': cause-specific hazard for each cause k (count_k / at_risk)
+        - 'conditional_survival': probability of not having any event at that time (1 - sum of csh_k)
     """
+    causes = _causes(events_data)
     return events_data.with_columns(
         [
-            (pl.col("count_1") / pl.col("at_risk")).alias("csh_1"),
-            (pl.col("count_2") / pl.col("at_risk")).alias("csh_2"),
+            (pl.col(f"count_{cause}") / pl.col("at_risk")).alias(f"csh_{cause}")
+            for cause in causes
         ]
     ).with_columns(
         [
-            (1 - pl.col("csh_1") - pl.col("csh_2")).alias("conditional_survival"),
+            (1 - pl.sum_horizontal([f"csh_{cause}" for cause in causes])).alias(
+                "conditional_survival"
+            ),
         ]
     )
 
 
-def add_overall_survival_column(events_data: pl.DataFrame) -> pl.DataFrame:
+def add_overall_survival_column(events_data: FrameT, by: By = None) -> FrameT:
     """
     Add a column for overall survival, defined as the cumulative product of
     the conditional survival probabilities up to and including each time point.
 
     Parameters
     ----------
-    events_data : pl.DataFrame
+    events_data : pl.DataFrame or pl.LazyFrame
         A Polars DataFrame with a column 'conditional_survival' representing
         the probability of surviving past each time point.
+    by : str or sequence of str, optional
+        Stratum columns. The frame must be sorted by ``by`` and ``times``.
 
     Returns
     -------
-    pl.DataFrame
-        The input DataFrame with an additional column 'overall_survival',
+    pl.DataFrame or pl.LazyFrame
+        The input frame with an additional column 'overall_survival',
         which contains the Kaplan-Meier-style survival probability at each time.
     """
     return events_data.with_columns(
-        pl.col("conditional_survival").cum_prod().alias("overall_survival")
+        _over(pl.col("conditional_survival").cum_prod(), by).alias("overall_survival")
     )
 
 
-def add_previous_overal_survival_column(events_data: pl.DataFrame) -> pl.DataFrame:
+def add_previous_overal_survival_column(events_data: FrameT, by: By = None) -> FrameT:
     """
     Add a column for previous overall survival, defined as the overall survival probability just before the current time point.
     Parameters
     ----------
-    events_data : pl.DataFrame
+    events_data : pl.DataFrame or pl.LazyFrame
         A Polars DataFrame with a column 'overall_survival' representing the overall survival probability at each time point.
+    by : str or sequence of str, optional
+        Stratum columns. The frame must be sorted by ``by`` and ``times``.
     Returns
     -------
-    pl.DataFrame
-        The input DataFrame with an additional column 'previous_overall_survival',
+    pl.DataFrame or pl.LazyFrame
+        The input frame with an additional column 'previous_overall_survival',
         which contains the overall survival probability at the previous time point.
     """
     return events_data.with_columns(
-        pl.col("overall_survival")
-        .shift(1, fill_value=1)
-        .alias("previous_overall_survival")
+        _over(pl.col("overall_survival").shift(1, fill_value=1), by).alias(
+            "previous_overall_survival"
+        )
     )
 
 
 def add_transition_probabilities_at_times_columns(
-    events_data: pl.DataFrame,
-) -> pl.DataFrame:
+    events_data: FrameT,
+) -> FrameT:
     """
     Add columns for transition probabilities at each time point based on cause-specific hazards and previous overall survival.
     Parameters
     ----------
-    events_data : pl.DataFrame
+    events_data : pl.DataFrame or pl.LazyFrame
         A Polars DataFrame with columns:
-        - 'csh_1': cause-specific hazard for event type 1,
-        - 'csh_2': cause-specific hazard for event type 2,
+        - 'csh_k': cause-specific hazard for each cause k,
         - 'previous_overall_survival': overall survival probability at the previous time point.
     Returns
     -------
-    pl.DataFrame
-        The input DataFrame with additional columns:
-        - 'trainsition_probabilities_to_1_at_times': transition probability to event type 1 at each time point,
-        - 'trainsition_probabilities_to_2_at_times': transition probability to event type 2 at each time point.
+    pl.DataFrame or pl.LazyFrame
+        The input frame with additional columns:
+        - 'trainsition_probabilities_to_k_at_times': transition probability to cause k at each time point.
     """
     return events_data.with_columns(
         [
-            (pl.col("csh_1") * pl.col("previous_overall_survival")).alias(
-                "trainsition_probabilities_to_1_at_times"
-            ),
-            (pl.col("csh_2") * pl.col("previous_overall_survival")).alias(
-                "trainsition_probabilities_to_2_at_times"
-            ),
+            (pl.col(f"csh_{cause}") * pl.col("previous_overall_survival")).alias(
+                f"trainsition_probabilities_to_{cause}_at_times"
+            )
+            for cause in _causes(events_data)
         ]
     )
 
 
 def add_state_occupancy_probabilities_at_times_columns(
-    events_data: pl.DataFrame,
-) -> pl.DataFrame:
+    events_data: FrameT, by: By = None
+) -> FrameT:
     """
     Add columns for state occupancy probabilities at each time point based on trainsition_probabilities_to_1_at_times and trainsition_probabilities_to_2_at_times columns.
     Parameters
     ----------
-    events_data : pl.DataFrame
+    events_data : pl.DataFrame or pl.LazyFrame
         A Polars DataFrame with columns 'trainsition_probabilities_to_1_at_times' and 'trainsition_probabilities_to_2_at_times'.
+    by : str or sequence of str, optional
+        Stratum columns. The frame must be sorted by ``by`` and ``times``.
     Returns
     -------
-    pl.DataFrame
-        The input DataFrame with additional columns 'state_occupancy_probability_1_at_times' and 'state_occupancy_probability_2_at_times',
+    pl.DataFrame or pl.LazyFrame
+        The input frame with additional columns 'state_occupancy_probability_1_at_times' and 'state_occupancy_probability_2_at_times',
         which contain the state occupancy probabilities at each time point. This function should sum all the previous values from state_occupancy_probability_1_at_times and state_occupancy_probability_2_at_times accordingly and assign the sum of the previous values to the new columns
         state_occupancy_probability_1 and state_occupancy_probability_2.
     """
     return events_data.with_columns(
         [
-            pl.col("trainsition_probabilities_to_1_at_times")
-            .cum_sum()
-            .alias("state_occupancy_probability_1_at_times"),
-            pl.col("trainsition_probabilities_to_2_at_times")
-            .cum_sum()
-            .alias("state_occupancy_probability_2_at_times"),
+            _over(
+                pl.col(f"trainsition_probabilities_to_{cause}_at_times").cum_sum(), by
+            ).alias(f"state_occupancy_probability_{cause}_at_times")
+            for cause in _causes(events_data)
         ]
     )
 
 
-def prepare_event_table(times_and_reals: pl.DataFrame) -> pl.DataFrame:
+def coarsen_times(times_and_reals: FrameT, time_grid: TimeGrid) -> FrameT:
+    """
+    Move every time up to the next point of a time grid.
+
+    A time in ``(g_{i-1}, g_i]`` becomes ``g_i``, so estimates at the grid
+    points see every exit up to that point. Times after the last grid point
+    become the largest time, keeping the number at risk at the grid points
+    exact.
+
+    Parameters
+    ----------
+    times_and_reals : pl.DataFrame or pl.LazyFrame
+        A frame with a ``times`` column.
+    time_grid : sequence of float, pl.Series or int
+        The grid points, or the number ``n`` of equally spaced points
+        ``min + k (max - min) / n`` for ``k = 1..n``, the last of which is the
+        largest time. The bound of :func:`add_coarsening_error_bound_column`
+        only holds at grid points, so a given grid should contain the
+        prediction horizons; an automatic grid in general does not.
+
+    Returns
+    -------
+    pl.DataFrame or pl.LazyFrame
+        The input frame with coarsened ``times`` of the same dtype.
+    """
+    times = pl.col("times")
+    dtype = times_and_reals.collect_schema()["times"]
+
+    if isinstance(time_grid, int):
+        if time_grid < 1:
+            raise ValueError("time_grid must have at least one point.")
+        # Built as explicit points so that rounding can neither move a time
+        # down nor past the largest time, which is the exact last point.
+        k = pl.int_range(1, time_grid + 1, dtype=pl.Int64)
+        step = (times.max() - times.min()) / time_grid
+        grid = (
+            pl.when(k == time_grid)
+            .then(times.max())
+            .otherwise((times.min() + k * step).clip(upper_bound=times.max()))
+        )
+        if dtype.is_integer():
+            grid = grid.ceil()
+        grid = grid.cast(dtype)
+        return times_and_reals.with_columns(
+            pl.when(times.is_not_null()).then(
+                grid.gather(grid.search_sorted(times, side="left"))
+            )
+        )
+
+    grid = pl.Series("times", time_grid).unique().sort().drop_nulls()
+    if grid.is_empty():
+        raise ValueError("time_grid must have at least one point.")
+    if dtype.is_integer() and grid.dtype.is_float():
+        # Integer times at or below a fractional grid point are at or below
+        # its floor.
+        grid = grid.floor()
+    grid = grid.cast(dtype, strict=True).unique(maintain_order=True)
+
+    index = pl.lit(grid).search_sorted(times, side="left").cast(pl.Int64)
+    return times_and_reals.with_columns(
+        pl.when(index < len(grid))
+        .then(pl.lit(grid).gather(index.clip(upper_bound=len(grid) - 1)))
+        .otherwise(times.max())
+        .alias("times")
+    )
+
+
+def add_coarsening_error_bound_column(events_data: FrameT, by: By = None) -> FrameT:
+    """
+    Add a bound on the error introduced by :func:`coarsen_times`.
+
+    Coarsening treats the ``C`` censorings of an interval as if they came
+    after its ``D`` events, so each event's hazard ``1 / n`` (with ``n`` the
+    exact number at risk just before it) is replaced by a smaller one. With
+    ``N`` at risk at the start of the interval, every exact ``n`` is at
+    least ``N - D - C + 1`` and differs from its coarsened counterpart by at
+    most ``C``, so the hazards of an interval change by at most
+
+        D C / ((N - D + 1) (N - D - C + 1)).
+
+    The Aalen-Johansen estimate is a product of stochastic matrices, so the
+    cumulative sum of these terms bounds the change of overall survival and
+    of every ``state_occupancy_probability_k_at_times`` at the grid points.
+    It is capped at 1, the largest possible change of a probability. Weights
+    are treated as frequencies.
+
+    Parameters
+    ----------
+    events_data : pl.DataFrame or pl.LazyFrame
+        An event table of coarsened times with the ``count_0``,
+        ``events_at_times`` and ``at_risk`` columns.
+    by : str or sequence of str, optional
+        Stratum columns. The frame must be sorted by ``by`` and ``times``.
+
+    Returns
+    -------
+    pl.DataFrame or pl.LazyFrame
+        The input frame with an additional column 'coarsening_error_bound'.
+    """
+    censored = pl.col("count_0")
+    events = pl.col("events_at_times") - censored
+    remaining = pl.col("at_risk") - events
+    term = events * censored / ((remaining + 1) * (remaining - censored + 1))
+    return events_data.with_columns(
+        _over(term.cum_sum(), by).clip(upper_bound=1.0).alias("coarsening_error_bound")
+    )
+
+
+def add_variance_columns(events_data: FrameT, by: By = None) -> FrameT:
+    """
+    Add delta-method variance columns for overall survival and state occupancy.
+
+    The variance of ``overall_survival`` is Greenwood's formula. The variance
+    of each ``state_occupancy_probability_k_at_times`` (the cumulative
+    incidence F_k) follows the delta method for the Aalen-Johansen estimator
+    (Collett, Modelling Survival Data in Medical Research, 3rd ed., p. 411):
+
+        Var F_k(t) = sum_j (F_k(t) - F_k(t_j))^2 d_j / (n_j (n_j - d_j))
+                     + sum_j S(t_j-1)^2 d_kj (n_j - d_kj) / n_j^3
+                     - 2 sum_j (F_k(t) - F_k(t_j)) S(t_j-1) d_kj / n_j^2
+
+    where the sums run over t_j <= t, d_j is the number of events of any cause
+    and n_j the number at risk. Expanding the squares turns every sum into a
+    cumulative sum over the existing columns, so the variances are computed
+    in the same query as the estimates. Terms with n_j = d_j, after which
+    nobody remains at risk, are taken as 0.
+
+    Parameters
+    ----------
+    events_data : pl.DataFrame or pl.LazyFrame
+        A Polars DataFrame with the ``count_*``, ``at_risk``,
+        ``overall_survival``, ``previous_overall_survival`` and
+        ``state_occupancy_probability_k_at_times`` columns.
+    by : str or sequence of str, optional
+        Stratum columns. The frame must be sorted by ``by`` and ``times``.
+
+    Returns
+    -------
+    pl.DataFrame or pl.LazyFrame
+        The input frame with additional columns 'overall_survival_variance'
+        and 'state_occupancy_probability_k_at_times_variance' for each cause k.
+    """
+
+    causes = _causes(events_data)
+    at_risk = pl.col("at_risk")
+    events = pl.sum_horizontal([f"count_{cause}" for cause in causes])
+    greenwood = (
+        pl.when(at_risk > events)
+        .then(events / (at_risk * (at_risk - events)))
+        .otherwise(0.0)
+    )
+
+    def cumulative(expr: pl.Expr) -> pl.Expr:
+        return _over(expr.cum_sum(), by)
+
+    greenwood_sum = cumulative(greenwood)
+
+    variances = [
+        (pl.col("overall_survival").pow(2) * greenwood_sum).alias(
+            "overall_survival_variance"
+        )
+    ]
+    for cause in causes:
+        incidence = pl.col(f"state_occupancy_probability_{cause}_at_times")
+        cause_events = pl.col(f"count_{cause}")
+        previous_survival = pl.col("previous_overall_survival")
+        squared_term = (
+            incidence.pow(2) * greenwood_sum
+            - 2 * incidence * cumulative(greenwood * incidence)
+            + cumulative(greenwood * incidence.pow(2))
+        )
+        binomial_term = cumulative(
+            previous_survival.pow(2)
+            * cause_events
+            * (at_risk - cause_events)
+            / at_risk.pow(3)
+        )
+        cross_weight = previous_survival * cause_events / at_risk.pow(2)
+        cross_term = incidence * cumulative(cross_weight) - cumulative(
+            cross_weight * incidence
+        )
+        variances.append(
+            (squared_term + binomial_term - 2 * cross_term)
+            .clip(lower_bound=0.0)
+            .alias(f"state_occupancy_probability_{cause}_at_times_variance")
+        )
+
+    return events_data.with_columns(variances)
+
+
+def prepare_event_table(
+    times_and_reals: FrameT | Any,
+    by: By = None,
+    variance: bool = False,
+    weights: str | None = None,
+    causes: Causes = None,
+    entry_times: str | None = None,
+    compact: bool = False,
+    dtypes: EventTableDtypes | None = None,
+    time_grid: TimeGrid = None,
+    times: str = "times",
+    reals: str = "reals",
+    assume_sorted: bool = False,
+) -> FrameT | pl.DataFrame:
     """Generate the full event table from raw ``times`` and ``reals`` data.
 
+    All steps are chained on a single ``pl.LazyFrame`` so Polars optimizes
+    them as one query plan (projection pushdown, common-subexpression
+    elimination) instead of materializing a frame per step.
+
     Parameters
     ----------
-    times_and_reals : pl.DataFrame
-        A Polars DataFrame containing at least ``times`` and ``reals`` columns.
+    times_and_reals : pl.DataFrame, pl.LazyFrame or frame-like
+        A frame containing at least ``times`` and ``reals`` columns. pandas
+        and Arrow frames, NumPy structured arrays and mappings of column
+        names to arrays are wrapped without copying, see
+        :func:`as_times_and_reals`.
+    by : str or sequence of str, optional
+        Stratum columns. Every stratum's event table is computed in the same
+        query with window expressions, and the result is sorted by ``by``
+        and ``times``.
+    variance : bool
+        Whether to add delta-method variance columns, see
+        :func:`add_variance_columns`.
+    weights : str, optional
+        Column of case weights, see :func:`group_reals_by_times`. With
+        frequency weights the result equals the one for the expanded rows;
+        the variance formulas treat any weights as frequencies.
+    causes : sequence of int, pl.Enum or "infer", optional
+        The competing causes, see :func:`group_reals_by_times`. Every cause
+        gets its hazard and occupancy columns from the same aggregation.
+    entry_times : str, optional
+        Column of delayed-entry (left-truncation) times. Individuals are at
+        risk only after entering, see :func:`add_entered_before_times_column`.
+    compact : bool
+        Keep only the columns :func:`predict_aj_estimates` reads: ``by``,
+        ``times``, ``overall_survival``, the
+        ``state_occupancy_probability_k_at_times`` columns and, with
+        ``variance``, their variances. Compact tables cannot be bootstrapped.
+    dtypes : EventTableDtypes, optional
+        Numeric dtypes of the output columns, see :class:`EventTableDtypes`.
+    time_grid : sequence of float, pl.Series or int, optional
+        Compute the table on a coarse time grid instead of every unique
+        time, see :func:`coarsen_times`. The table then has one row per
+        grid point with exits and a ``coarsening_error_bound`` column
+        bounding the change of every estimate at these points, see
+        :func:`add_coarsening_error_bound_column`. Cannot be combined with
+        ``entry_times``.
+    times : str
+        Column of observed times. The event table always calls it ``times``.
+    reals : str
+        Column of event types.
+    assume_sorted : bool
+        Whether the input is already sorted by ``by`` and ``times``, see
+        :func:`group_reals_by_times`. An unstratified ``pl.DataFrame`` is
+        checked for sortedness either way.
 
     Returns
     -------
-    pl.DataFrame
-        The event table with all intermediate columns computed.
+    pl.DataFrame or pl.LazyFrame
+        The event table with all intermediate columns computed. A
+        ``pl.LazyFrame`` input returns the uncollected plan; any other input
+        is collected once with the streaming engine.
     """
 
-    return (
-        times_and_reals.pipe(group_reals_by_times)
-        .pipe(add_events_at_times_column)
-        .pipe(add_at_risk_column)
-        .pipe(add_cause_specific_hazards_columns)
-        .pipe(add_overall_survival_column)
-        .pipe(add_previous_overal_survival_column)
-        .pipe(add_transition_probabilities_at_times_columns)
-        .pipe(add_state_occupancy_probabilities_at_times_columns)
+    times_and_reals = as_times_and_reals(times_and_reals, times, reals)
+    plan = _event_table_plan(
+        times_and_reals,
+        by=by,
+        variance=variance,
+        weights=weights,
+        causes=causes,
+        entry_times=entry_times,
+        compact=compact,
+        dtypes=dtypes,
+        time_grid=time_grid,
+        assume_sorted=assume_sorted,
+    )
+
+    if isinstance(times_and_reals, pl.LazyFrame):
+        return plan
+
+    return plan.collect(engine="streaming")
+
+
+def _event_table_plan(
+    times_and_reals: pl.DataFrame | pl.LazyFrame,
+    *,
+    by: By,
+    variance: bool,
+    weights: str | None,
+    causes: Causes,
+    entry_times: str | None = None,
+    compact: bool = False,
+    dtypes: EventTableDtypes | None = None,
+    time_grid: TimeGrid = None,
+    assume_sorted: bool = False,
+) -> pl.LazyFrame:
+    coarsened = time_grid is not None
+    if coarsened:
+        if entry_times is not None:
+            raise ValueError("time_grid cannot be combined with entry_times.")
+        times_and_reals = times_and_reals.pipe(run_stage, coarsen_times, time_grid)
+
+    # A pl.DataFrame is counted eagerly so that sorted input can take the
+    # run-length path of group_reals_by_times; the rest is one lazy plan.
+    counts = times_and_reals.pipe(
+        run_stage, group_reals_by_times, by, weights, causes, assume_sorted
+    ).lazy()
+    if entry_times is not None:
+        counts = counts.pipe(
+            run_stage,
+            add_entered_before_times_column,
+            times_and_reals.lazy(),
+            entry_times,
+            by,
+            weights,
+        )
+    return counts.pipe(
+        _event_table_from_counts, by, variance, compact, dtypes, coarsened
+    )
+
+
+def _event_table_from_counts(
+    counts: pl.LazyFrame,
+    by: By,
+    variance: bool = False,
+    compact: bool = False,
+    dtypes: EventTableDtypes | None = None,
+    coarsened: bool = False,
+) -> pl.LazyFrame:
+    event_table = counts.pipe(run_stage, add_events_at_times_column).pipe(
+        run_stage, add_at_risk_column, by
+    )
+    if coarsened:
+        event_table = event_table.pipe(run_stage, add_coarsening_error_bound_column, by)
+    event_table = (
+        event_table.pipe(run_stage, add_cause_specific_hazards_columns)
+        .pipe(run_stage, add_overall_survival_column, by)
+        .pipe(run_stage, add_previous_overal_survival_column, by)
+        .pipe(run_stage, add_transition_probabilities_at_times_columns)
+        .pipe(run_stage, add_state_occupancy_probabilities_at_times_columns, by)
+    )
+    if variance:
+        event_table = event_table.pipe(run_stage, add_variance_columns, by)
+    if compact:
+        event_table = event_table.pipe(run_stage, _compact_columns, by)
+    if dtypes is not None:
+        event_table = event_table.pipe(
+            run_stage, dtypes.cast, _by_columns(by), stage="cast_dtypes"
+        )
+    return event_table
+
+
+def _compact_columns(event_table: FrameT, by: By = None) -> FrameT:
+    """Keep the columns :func:`predict_aj_estimates` reads."""
+    return event_table.select(
+        *_by_columns(by),
+        "times",
+        pl.col(r"^coarsening_error_bound$"),
+        pl.col(r"^overall_survival(_variance)?$"),
+        pl.col(r"^state_occupancy_probability_\d+_at_times(_variance)?$"),
     )
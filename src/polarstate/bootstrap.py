@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import polars as pl
+
+from .aj import By, _by_columns, _causes
+
+# Upper bound on the number of array elements held per vectorized chunk.
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def bootstrap_aj_estimates(
+    event_table: pl.DataFrame,
+    fixed_time_horizons: pl.Series,
+    n_bootstrap: int = 1000,
+    confidence_level: float = 0.95,
+    seed: int | None = None,
+    n_jobs: int | None = None,
+    by: By = None,
+) -> pl.DataFrame:
+    """Bootstrap percentile intervals for state-occupancy probabilities.
+
+    Resampling subjects with replacement is equivalent to drawing the
+    per-time ``count_*`` cells of the event table from a multinomial
+    distribution, so all replicates are built directly from the count table
+    in chunks of vectorized NumPy arrays without touching the raw rows.
+    Chunks are spread over a thread pool and each chunk has its own seed
+    derived from ``seed``, so results do not depend on ``n_jobs``.
+
+    Parameters
+    ----------
+    event_table : pl.DataFrame
+        The event table created by :func:`prepare_event_table`.
+    fixed_time_horizons : pl.Series
+        Times at which to obtain the intervals.
+    n_bootstrap : int
+        Number of bootstrap replicates.
+    confidence_level : float
+        Coverage of the percentile intervals.
+    seed : int, optional
+        Seed for reproducible replicates.
+    n_jobs : int, optional
+        Number of worker threads. Defaults to the number of CPUs.
+    by : str or sequence of str, optional
+        Stratum columns of a stratified ``event_table``.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per stratum and unique horizon with
+        ``state_occupancy_probability_{k}_lower`` and ``_upper`` columns.
+
+    Raises
+    ------
+    ValueError
+        If the event table has delayed entry, which the resampled counts do
+        not carry, or fractional case weights, which cannot be resampled as
+        subjects.
+    """
+
+    if "entered_before_times" in event_table.columns:
+        raise ValueError(
+            "Bootstrap intervals assume everyone is at risk from time 0 and do "
+            "not support event tables with entry_times."
+        )
+
+    counts = event_table.select(pl.col(r"^count_\d+$"))
+    if (
+        any(dtype.is_float() for dtype in counts.dtypes)
+        and not counts.select(pl.all_horizontal((pl.all() % 1 == 0).all())).item()
+    ):
+        raise ValueError(
+            "Bootstrap intervals resample subjects and need whole counts; the "
+            "event table has fractional weights."
+        )
+
+    by = _by_columns(by)
+    alpha = 1 - confidence_level
+    horizons = fixed_time_horizons.unique().sort()
+
+    strata = (
+        event_table.partition_by(by, as_dict=True, maintain_order=True)
+        if by
+        else {(): event_table}
+    )
+    seeds = np.random.SeedSequence(seed).spawn(len(strata))
+
+    frames = []
+    with ThreadPoolExecutor(n_jobs) as executor:
+        for (key, stratum), stratum_seed in zip(strata.items(), seeds):
+            stratum = stratum.sort("times")
+            states, replicates = _bootstrap_replicates(
+                stratum, horizons, n_bootstrap, stratum_seed, executor
+            )
+            lower, upper = np.quantile(replicates, [alpha / 2, 1 - alpha / 2], axis=0)
+            frames.append(
+                pl.DataFrame(
+                    [
+                        *(
+                            pl.Series(column, [value] * len(horizons))
+                            for column, value in zip(by, key)
+                        ),
+                        horizons.alias("times"),
+                        *(
+                            pl.Series(
+                                f"state_occupancy_probability_{state}_{bound}",
+                                values[:, i],
+                            )
+                            for i, state in enumerate(states)
+                            for bound, values in (("lower", lower), ("upper", upper))
+                        ),
+                    ]
+                )
+            )
+
+    return pl.concat(frames)
+
+
+def _bootstrap_replicates(
+    event_table: pl.DataFrame,
+    horizons: pl.Series,
+    n_bootstrap: int,
+    seed: np.random.SeedSequence,
+    executor: ThreadPoolExecutor,
+) -> tuple[list[int], np.ndarray]:
+    causes = [0, *_causes(event_table)]
+    # Frequency-weighted counts are whole numbers stored as floats.
+    counts = np.column_stack(
+        [event_table.get_column(f"count_{cause}").to_numpy() for cause in causes]
+    ).astype(np.int64)
+    times = event_table.get_column("times").to_numpy()
+    horizon_index = np.searchsorted(times, horizons.to_numpy(), side="right") - 1
+
+    cell, n_rows = _collapse_after_horizons(
+        np.arange(len(counts))[:, None],
+        np.arange(len(causes)),
+        len(causes),
+        horizon_index,
+    )
+    counts = np.bincount(
+        cell.ravel(), weights=counts.ravel(), minlength=(n_rows + 1) * len(causes)
+    ).reshape(n_rows + 1, len(causes))
+
+    n_times, n_causes = counts.shape
+    n_total = int(counts.sum())
+    probabilities = (counts / n_total).ravel()
+
+    chunk_size = max(1, _CHUNK_ELEMENTS // probabilities.size)
+    chunk_sizes = [
+        min(chunk_size, n_bootstrap - start)
+        for start in range(0, n_bootstrap, chunk_size)
+    ]
+
+    def run_chunk(size: int, chunk_seed: np.random.SeedSequence) -> np.ndarray:
+        rng = np.random.default_rng(chunk_seed)
+        resampled = rng.multinomial(n_total, probabilities, size=size).reshape(
+            size, n_times, n_causes
+        )
+        return _state_occupancy_at(resampled, causes, horizon_index)
+
+    chunks = executor.map(run_chunk, chunk_sizes, seed.spawn(len(chunk_sizes)))
+    states = [0, *(cause for cause in causes if cause != 0)]
+    return states, np.concatenate(list(chunks))
+
+
+def _collapse_after_horizons(
+    rows: np.ndarray, columns: np.ndarray, n_columns: int, horizon_index: np.ndarray
+) -> tuple[np.ndarray, int]:
+    """Flat cells of a count table cut after the last horizon.
+
+    ``rows`` index the times of the event table and ``columns`` the
+    ``n_columns`` states, with censoring (state 0) first; they are broadcast
+    together. Rows after the last horizon only matter through the at-risk
+    totals, so they are collapsed into a single censoring cell after the
+    kept rows. Returns the cells, in a table of ``n_rows + 1`` rows, and
+    ``n_rows``.
+    """
+
+    n_rows = int(horizon_index.max(initial=-1)) + 1
+    cell = np.where(rows < n_rows, rows * n_columns + columns, n_rows * n_columns)
+    return cell, n_rows
+
+
+def _state_occupancy_at(
+    counts: np.ndarray, causes: list[int], horizon_index: np.ndarray
+) -> np.ndarray:
+    """Aalen-Johansen state occupancy for a batch of count tables.
+
+    ``counts`` has shape ``(replicates, times, causes)``; the result has shape
+    ``(replicates, horizons, states)`` with state 0 first.
+    """
+
+    at_risk = np.cumsum(counts.sum(axis=2)[:, ::-1], axis=1)[:, ::-1]
+    event_columns = [i for i, cause in enumerate(causes) if cause != 0]
+    hazards = np.divide(
+        counts[:, :, event_columns],
+        at_risk[:, :, None],
+        out=np.zeros((*at_risk.shape, len(event_columns))),
+        where=at_risk[:, :, None] > 0,
+    )
+    overall_survival = np.cumprod(1 - hazards.sum(axis=2), axis=1)
+    previous_overall_survival = np.concatenate(
+        [np.ones((len(counts), 1)), overall_survival[:, :-1]], axis=1
+    )
+    occupancy = np.cumsum(hazards * previous_overall_survival[:, :, None], axis=1)
+
+    estimates = np.concatenate([overall_survival[:, :, None], occupancy], axis=2)
+    # Horizons before the first observed time keep everyone in state 0.
+    initial = np.zeros(estimates.shape[2])
+    initial[0] = 1.0
+    estimates = np.concatenate(
+        [np.broadcast_to(initial, (len(counts), 1, len(initial))), estimates], axis=1
+    )
+    return estimates[:, horizon_index + 1]
@@ -0,0 +1,159 @@
+"""Command line interface for batch event-table jobs.
+
+Every file matched by the input globs is an independent job: it is scanned
+lazily, turned into an event table (and optionally predictions at fixed
+horizons) and written as Parquet. Jobs run concurrently in a thread pool::
+
+    polarstate "data/*.parquet" --times time --reals status --by site \\
+        --horizons 365 730 --output-dir out --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+import polars as pl
+
+from .aj import Causes, prepare_event_table
+from .instrument import StageRecorder, run_stage
+from .predict import predict_aj_estimates
+from .scan import scan_times_and_reals
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point of the ``polarstate`` console script."""
+
+    args = _parser().parse_args(argv)
+
+    paths = sorted({path for pattern in args.inputs for path in glob.glob(pattern)})
+    if not paths:
+        raise SystemExit("No input files match the given patterns.")
+
+    # Outputs are named by the input stem, so inputs sharing one would
+    # overwrite each other's results.
+    stems: dict[str, list[str]] = {}
+    for path in paths:
+        stems.setdefault(Path(path).stem, []).append(path)
+    collisions = [group for group in stems.values() if len(group) > 1]
+    if collisions:
+        raise SystemExit(
+            "Inputs with the same file name stem would write the same outputs: "
+            + "; ".join(", ".join(group) for group in collisions)
+        )
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(args.workers) as executor:
+        profiles = list(
+            executor.map(lambda path: _run_job(path, output_dir, args), paths)
+        )
+
+    if args.profile:
+        with pl.Config(tbl_rows=-1, tbl_width_chars=200, tbl_hide_dataframe_shape=True):
+            print(pl.concat(profiles), file=sys.stderr)
+
+
+def _run_job(path: str, output_dir: Path, args: argparse.Namespace) -> pl.DataFrame:
+    with StageRecorder() if args.profile else nullcontext() as recorder:
+        event_table = prepare_event_table(
+            scan_times_and_reals(path, args.format),
+            by=args.by,
+            variance=args.variance,
+            weights=args.weights,
+            causes=_causes(args.causes),
+            times=args.times,
+            reals=args.reals,
+        ).collect(engine="streaming")
+        stem = Path(path).stem
+        run_stage(
+            event_table,
+            _write,
+            output_dir / f"{stem}.event_table.parquet",
+            stage="write_event_table",
+        )
+
+        if args.horizons:
+            predictions = predict_aj_estimates(
+                event_table,
+                pl.Series("times", args.horizons).cast(event_table.schema["times"]),
+                by=args.by,
+            )
+            run_stage(
+                predictions,
+                _write,
+                output_dir / f"{stem}.predictions.parquet",
+                stage="write_predictions",
+            )
+
+    if recorder is None:
+        return pl.DataFrame()
+    return recorder.to_frame().select(pl.lit(path).alias("input"), pl.exclude("plan"))
+
+
+def _write(frame: pl.DataFrame, path: Path) -> pl.DataFrame:
+    frame.write_parquet(path)
+    return frame
+
+
+def _causes(causes: list[str] | None) -> Causes:
+    if causes is None:
+        return None
+    if causes == ["infer"]:
+        return "infer"
+    return [int(cause) for cause in causes]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="polarstate",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "inputs", nargs="+", metavar="INPUT", help="Parquet, CSV or IPC files or globs."
+    )
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "csv", "ipc"],
+        help="Input format. Inferred from the file extension when omitted.",
+    )
+    parser.add_argument("--times", default="times", help="Column of observed times.")
+    parser.add_argument("--reals", default="reals", help="Column of event types.")
+    parser.add_argument("--by", nargs="+", metavar="COLUMN", help="Stratum columns.")
+    parser.add_argument("--weights", metavar="COLUMN", help="Column of case weights.")
+    parser.add_argument(
+        "--causes",
+        nargs="+",
+        metavar="CAUSE",
+        help="Competing causes, or 'infer'. Defaults to 1 2.",
+    )
+    parser.add_argument(
+        "--variance", action="store_true", help="Add delta-method variance columns."
+    )
+    parser.add_argument(
+        "--horizons",
+        nargs="+",
+        type=float,
+        metavar="TIME",
+        help="Also write predictions at these fixed time horizons.",
+    )
+    parser.add_argument("-o", "--output-dir", default=".", help="Output directory.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of inputs processed concurrently. Defaults to the CPUs.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run stage by stage and report the time, rows and memory of every "
+        "stage on stderr, see StageRecorder.",
+    )
+    return parser
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+
+from .aj import (
+    By,
+    Causes,
+    _by_columns,
+    _causes,
+    _event_table_from_counts,
+    group_reals_by_times,
+)
+from .dtypes import EventTableDtypes
+from .inputs import as_times_and_reals
+
+
+@dataclass(frozen=True, eq=False)
+class EventCounts:
+    """Per-time event counts, the sufficient statistic of the event table.
+
+    An ``EventCounts`` holds the output of :func:`group_reals_by_times`. It
+    can be built independently per batch or per worker, merged associatively
+    and finalized into the full :func:`prepare_event_table` output without
+    revisiting the raw rows.
+
+    Parameters
+    ----------
+    counts : pl.DataFrame
+        One row per stratum and unique time with ``times`` and the
+        ``count_*`` columns.
+    by : tuple of str
+        Stratum columns of ``counts``.
+    """
+
+    counts: pl.DataFrame
+    by: tuple[str, ...] = ()
+
+    @classmethod
+    def from_times_and_reals(
+        cls,
+        times_and_reals: pl.DataFrame | pl.LazyFrame | Any,
+        by: By = None,
+        weights: str | None = None,
+        causes: Causes = None,
+        times: str = "times",
+        reals: str = "reals",
+        assume_sorted: bool = False,
+    ) -> EventCounts:
+        """Count events per unique time in a batch of raw ``times`` and ``reals``.
+
+        Parameters
+        ----------
+        times_and_reals : pl.DataFrame, pl.LazyFrame or frame-like
+            A frame containing at least ``times`` and ``reals`` columns, see
+            :func:`as_times_and_reals`.
+        by : str or sequence of str, optional
+            Stratum columns.
+        weights : str, optional
+            Column of case weights, see :func:`group_reals_by_times`.
+        causes : sequence of int, pl.Enum or "infer", optional
+            The competing causes, see :func:`group_reals_by_times`.
+        times : str
+            Column of observed times.
+        reals : str
+            Column of event types.
+        assume_sorted : bool
+            Whether the batch is sorted by ``by`` and ``times``, see
+            :func:`group_reals_by_times`.
+
+        Returns
+        -------
+        EventCounts
+            The counts of this batch.
+        """
+
+        counts = group_reals_by_times(
+            as_times_and_reals(times_and_reals, times, reals),
+            by,
+            weights,
+            causes,
+            assume_sorted,
+        )
+        if isinstance(counts, pl.LazyFrame):
+            counts = counts.collect(engine="streaming")
+        return cls(counts, tuple(_by_columns(by)))
+
+    def merge(self, *others: EventCounts) -> EventCounts:
+        """Combine these counts with the counts of other batches.
+
+        Merging is associative and commutative, so batches can be combined in
+        any order or as a tree across processes.
+
+        Parameters
+        ----------
+        *others : EventCounts
+            Counts built with the same ``by`` columns.
+
+        Returns
+        -------
+        EventCounts
+            Counts of all batches together, sorted by ``by`` and ``times``.
+        """
+
+        for other in others:
+            if other.by != self.by:
+                raise ValueError(
+                    f"Cannot merge counts stratified by {list(other.by)} "
+                    f"into counts stratified by {list(self.by)}."
+                )
+
+        keys = [*self.by, "times"]
+        # Batches may have seen different causes; missing ones count 0.
+        counts = (
+            pl.concat(
+                [self.counts, *(other.counts for other in others)],
+                how="diagonal_relaxed",
+            )
+            .group_by(keys)
+            .agg(pl.col("^count_.*$").fill_null(0).sum())
+            .sort(keys)
+        )
+        counts = counts.select(
+            *keys, *(f"count_{real}" for real in (0, *_causes(counts)))
+        )
+        return EventCounts(counts, self.by)
+
+    def __add__(self, other: EventCounts) -> EventCounts:
+        return self.merge(other)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EventCounts):
+            return NotImplemented
+        return self.by == other.by and self.counts.equals(other.counts)
+
+    def finalize(
+        self,
+        variance: bool = False,
+        compact: bool = False,
+        dtypes: EventTableDtypes | None = None,
+    ) -> pl.DataFrame:
+        """Compute the event table from the counts.
+
+        Parameters
+        ----------
+        variance : bool
+            Whether to add delta-method variance columns.
+        compact : bool
+            Keep only the columns needed for prediction, see
+            :func:`prepare_event_table`.
+        dtypes : EventTableDtypes, optional
+            Numeric dtypes of the output columns.
+
+        Returns
+        -------
+        pl.DataFrame
+            The same table :func:`prepare_event_table` returns for the union
+            of all raw rows that went into these counts.
+        """
+
+        return (
+            self.counts.lazy()
+            .pipe(_event_table_from_counts, list(self.by), variance, compact, dtypes)
+            .collect(engine="streaming")
+        )
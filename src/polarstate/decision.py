@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+import polars as pl
+
+from .aj import Causes, _causes, prepare_event_table
+from .bootstrap import _CHUNK_ELEMENTS, _collapse_after_horizons, _state_occupancy_at
+
+
+def net_benefit(
+    times_and_reals: pl.DataFrame,
+    predictions: str,
+    fixed_time_horizons: pl.Series,
+    thresholds: pl.Series | None = None,
+    cause: int = 1,
+    causes: Causes = None,
+) -> pl.DataFrame:
+    """Decision-curve net benefit at many risk thresholds and horizons.
+
+    Subjects with a predicted risk at or above a threshold are treated. The
+    net benefit at threshold ``p`` and horizon ``h`` is
+    ``P(treated) * F(h) - P(treated) * (1 - F(h)) * p / (1 - p)``, where
+    ``F`` is the Aalen-Johansen cumulative incidence of ``cause`` among the
+    treated.
+
+    The treated subgroups are nested, so subjects are sorted by threshold
+    bin once and the per-time ``count_*`` table of each subgroup is the
+    previous subgroup's table plus the counts of one bin. All subgroups are
+    then estimated in chunks of vectorized NumPy arrays, as in
+    :func:`bootstrap_aj_estimates`, without filtering and refitting.
+
+    Parameters
+    ----------
+    times_and_reals : pl.DataFrame
+        A Polars DataFrame containing ``times``, ``reals`` and the
+        ``predictions`` column, one row per subject.
+    predictions : str
+        Column with the predicted risk of ``cause``.
+    fixed_time_horizons : pl.Series
+        Times at which to evaluate the net benefit.
+    thresholds : pl.Series, optional
+        Risk thresholds in ``[0, 1)``. Defaults to ``0, 0.01, ..., 0.99``.
+    cause : int
+        The event of interest.
+    causes : sequence of int, pl.Enum or "infer", optional
+        The competing causes, see :func:`group_reals_by_times`.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per horizon and threshold with ``times``, ``threshold``,
+        ``net_benefit`` and ``net_benefit_treat_all``.
+    """
+
+    if thresholds is None:
+        thresholds = pl.Series(np.arange(100) / 100)
+    thresholds = np.sort(pl.Series(thresholds).cast(pl.Float64).to_numpy())
+    if len(thresholds) and (thresholds[0] < 0 or thresholds[-1] >= 1):
+        raise ValueError("thresholds must be in [0, 1).")
+
+    event_table = prepare_event_table(times_and_reals, causes=causes)
+    states = [0, *_causes(event_table)]
+    times = event_table.get_column("times").to_numpy()
+
+    horizons = pl.Series("times", fixed_time_horizons)
+    horizon_index = np.searchsorted(times, horizons.to_numpy(), side="right") - 1
+
+    reals = times_and_reals.get_column("reals")
+    if isinstance(causes, pl.Enum):
+        reals = reals.cast(causes).to_physical()
+    reals = reals.to_numpy()
+    status = np.full(len(reals), -1)
+    for i, state in enumerate(states):
+        status[reals == state] = i
+    counted = status >= 0
+
+    n_states = len(states)
+    cell, n_rows = _collapse_after_horizons(
+        np.searchsorted(times, times_and_reals.get_column("times").to_numpy()),
+        status,
+        n_states,
+        horizon_index,
+    )
+    n_cells = (n_rows + 1) * n_states
+
+    # Subject i is treated at threshold j when j < bins[i].
+    risk = times_and_reals.get_column(predictions).cast(pl.Float64).to_numpy()
+    bins = np.searchsorted(thresholds, risk, side="right")
+    order = np.argsort(-bins[counted], kind="stable")
+    bins = bins[counted][order]
+    cell = cell[counted][order]
+    n_subjects = len(bins)
+
+    event_column = states.index(cause)
+    treat_all = _state_occupancy_at(
+        np.bincount(cell, minlength=n_cells).reshape(1, n_rows + 1, n_states),
+        states,
+        horizon_index,
+    )[0, :, event_column]
+
+    incidence = np.empty((len(thresholds), len(horizons)))
+    treated = np.empty(len(thresholds))
+    carried = np.zeros((n_rows + 1, n_states), dtype=np.int64)
+    chunk = max(1, _CHUNK_ELEMENTS // n_cells)
+    for stop in range(len(thresholds), 0, -chunk):
+        start = max(0, stop - chunk)
+        # Subjects in bins start + 1 .. stop, ordered from bin stop down.
+        first = np.searchsorted(-bins, -stop, side="left")
+        last = np.searchsorted(-bins, -(start + 1), side="right")
+        counts = np.bincount(
+            (stop - bins[first:last]) * n_cells + cell[first:last],
+            minlength=(stop - start) * n_cells,
+        ).reshape(stop - start, n_rows + 1, n_states)
+        counts = np.cumsum(counts, axis=0) + carried
+        carried = counts[-1]
+
+        # counts[k] is the treated subgroup of threshold stop - 1 - k.
+        counts = counts[::-1]
+        incidence[start:stop] = _state_occupancy_at(counts, states, horizon_index)[
+            :, :, event_column
+        ]
+        treated[start:stop] = counts.sum(axis=(1, 2))
+
+    treated = treated[:, None] / max(n_subjects, 1)
+    odds = (thresholds / (1 - thresholds))[:, None]
+    benefit = treated * incidence - treated * (1 - incidence) * odds
+    benefit_treat_all = treat_all[None, :] - (1 - treat_all[None, :]) * odds
+
+    return pl.DataFrame(
+        [
+            pl.Series("times", np.repeat(horizons.to_numpy(), len(thresholds))).cast(
+                horizons.dtype
+            ),
+            pl.Series("threshold", np.tile(thresholds, len(horizons))),
+            pl.Series("net_benefit", benefit.T.ravel()),
+            pl.Series("net_benefit_treat_all", benefit_treat_all.T.ravel()),
+        ]
+    )
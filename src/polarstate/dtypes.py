@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+
+_COUNT_COLUMNS = re.compile(
+    r"^(count_\d+|events_at_times|at_risk|entered_before_times)$"
+)
+
+
+@dataclass(frozen=True)
+class EventTableDtypes:
+    """Numeric dtypes of the columns of an event table.
+
+    Every field left as ``None`` keeps the dtype :func:`prepare_event_table`
+    produces (``Float64`` probabilities, ``Int64`` counts when unweighted and
+    the input dtype for ``times``). Narrower dtypes cut the memory of cached
+    event tables::
+
+        EventTableDtypes(probabilities=pl.Float32, counts=pl.UInt32, times=pl.Int32)
+
+    Counts and times are cast strictly and must survive a round trip back to
+    their original dtype, so an overflowing count, a fractional weighted
+    count or a time that the narrower type cannot represent exactly raises
+    instead of silently changing the table. Probabilities are rounded to the
+    nearest ``Float32`` (a relative error below 6e-8).
+
+    Parameters
+    ----------
+    probabilities : pl.Float32 or pl.Float64, optional
+        Dtype of hazards, survival, occupancy and variance columns.
+    counts : integer dtype, optional
+        Dtype of ``count_*``, ``events_at_times``, ``at_risk`` and
+        ``entered_before_times``.
+    times : numeric dtype, optional
+        Dtype of ``times``.
+    """
+
+    probabilities: Any = None
+    counts: Any = None
+    times: Any = None
+
+    def __post_init__(self) -> None:
+        for field, valid, expected in (
+            ("probabilities", lambda dtype: dtype.is_float(), "a float"),
+            ("counts", lambda dtype: dtype.is_integer(), "an integer"),
+            ("times", lambda dtype: dtype.is_numeric(), "a numeric"),
+        ):
+            dtype = getattr(self, field)
+            if dtype is None:
+                continue
+            is_dtype = isinstance(dtype, pl.DataType) or (
+                isinstance(dtype, type) and issubclass(dtype, pl.DataType)
+            )
+            if not is_dtype or not valid(dtype):
+                raise ValueError(f"{field} must be {expected} dtype, got {dtype}.")
+
+    def cast(self, event_table: pl.DataFrame | pl.LazyFrame, by: list[str]) -> Any:
+        """Cast the columns of ``event_table`` other than ``by`` to this policy.
+
+        Parameters
+        ----------
+        event_table : pl.DataFrame or pl.LazyFrame
+            An event table.
+        by : list of str
+            Stratum columns, which keep their dtypes.
+
+        Returns
+        -------
+        pl.DataFrame or pl.LazyFrame
+            The cast event table.
+
+        Raises
+        ------
+        ValueError
+            If a count or time does not round-trip through its new dtype.
+        """
+
+        casts = []
+        for name, dtype in event_table.collect_schema().items():
+            if name in by:
+                continue
+            if name == "times":
+                target = self.times
+            elif _COUNT_COLUMNS.match(name):
+                target = self.counts
+            elif dtype.is_float():
+                casts.append(
+                    pl.col(name).cast(self.probabilities or dtype, strict=True)
+                )
+                continue
+            else:
+                continue
+            if target is not None and target != dtype:
+                casts.append(
+                    pl.col(name).map_batches(
+                        _exact_cast(name, target), return_dtype=target
+                    )
+                )
+        return event_table.with_columns(casts)
+
+
+def _exact_cast(name: str, dtype: Any) -> Any:
+    def cast(values: pl.Series) -> pl.Series:
+        try:
+            cast_values = values.cast(dtype, strict=True)
+        except pl.exceptions.InvalidOperationError:
+            cast_values = None
+        if cast_values is None or not (cast_values.cast(values.dtype) == values).all():
+            raise ValueError(f"{name} cannot be represented exactly as {dtype}.")
+        return cast_values
+
+    return cast
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import numpy as np
+import polars as pl
+
+from .aj import _occupied_states, prepare_event_table
+
+# Columns prepare_event_table can write; any other column is a stratum key.
+_EVENT_TABLE_COLUMN = re.compile(
+    r"^(times|at_risk|events_at_times|entered_before_times|conditional_survival"
+    r"|(previous_)?overall_survival(_variance)?|coarsening_error_bound"
+    r"|count_\d+|csh_\d+|trainsition_probabilities_to_\d+_at_times"
+    r"|state_occupancy_probability_\d+_at_times(_variance)?)$"
+)
+
+
+class EventTable:
+    """A fitted event table indexed for repeated prediction.
+
+    The table is sorted once on construction and its times and state-occupancy
+    probabilities are kept as contiguous NumPy arrays, so :meth:`predict`
+    answers each call with a binary search instead of a sort and a
+    ``join_asof``.
+
+    Parameters
+    ----------
+    event_table : pl.DataFrame
+        An unstratified event table created by :func:`prepare_event_table`.
+
+    Raises
+    ------
+    ValueError
+        If ``event_table`` has columns other than those of
+        :func:`prepare_event_table`, such as stratum columns, or repeats a
+        time.
+    """
+
+    def __init__(self, event_table: pl.DataFrame) -> None:
+        strata = [
+            column
+            for column in event_table.columns
+            if not _EVENT_TABLE_COLUMN.match(column)
+        ]
+        if strata or event_table.get_column("times").n_unique() != event_table.height:
+            raise ValueError(
+                "EventTable needs an unstratified event table with one row per "
+                f"time and no stratum columns (found {strata}); use "
+                "predict_aj_estimates(..., by=...) for stratified tables."
+            )
+        if not event_table.get_column("times").is_sorted():
+            event_table = event_table.sort("times")
+
+        self.table = event_table
+        self.states = [0, *_occupied_states(event_table)]
+
+        occupancy = np.column_stack(
+            [
+                event_table.get_column(
+                    f"state_occupancy_probability_{state}_at_times"
+                ).to_numpy()
+                for state in self.states[1:]
+            ]
+        )
+        occupancy = np.column_stack([1 - occupancy.sum(axis=1), occupancy])
+
+        self._times = np.ascontiguousarray(event_table.get_column("times").to_numpy())
+        # Row 0 holds the occupancy before the first observed time.
+        initial = np.zeros((1, len(self.states)))
+        initial[0, 0] = 1.0
+        self._occupancy = np.ascontiguousarray(np.vstack([initial, occupancy]))
+
+    @classmethod
+    def fit(
+        cls,
+        times_and_reals: pl.DataFrame | Any,
+        times: str = "times",
+        reals: str = "reals",
+        assume_sorted: bool = False,
+    ) -> EventTable:
+        """Fit the event table from raw ``times`` and ``reals`` data.
+
+        Parameters
+        ----------
+        times_and_reals : pl.DataFrame or frame-like
+            A frame containing at least ``times`` and ``reals`` columns, see
+            :func:`as_times_and_reals`.
+        times : str
+            Column of observed times.
+        reals : str
+            Column of event types.
+        assume_sorted : bool
+            Whether the input is sorted by time, see
+            :func:`group_reals_by_times`.
+
+        Returns
+        -------
+        EventTable
+            The fitted event table.
+        """
+
+        return cls(
+            prepare_event_table(
+                times_and_reals, times=times, reals=reals, assume_sorted=assume_sorted
+            )
+        )
+
+    def predict_numpy(self, fixed_time_horizons: np.ndarray) -> np.ndarray:
+        """Look up state-occupancy probabilities as a NumPy array.
+
+        Parameters
+        ----------
+        fixed_time_horizons : np.ndarray
+            Times at which to obtain the state-occupancy probabilities.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape ``(len(fixed_time_horizons), len(self.states))``
+            in the order of ``fixed_time_horizons``.
+        """
+
+        index = np.searchsorted(self._times, fixed_time_horizons, side="right")
+        return self._occupancy[index]
+
+    def predict(self, fixed_time_horizons: pl.Series) -> pl.DataFrame:
+        """Predict state-occupancy probabilities at ``fixed_time_horizons``.
+
+        Parameters
+        ----------
+        fixed_time_horizons : pl.Series
+            Times at which to obtain the state-occupancy probabilities.
+
+        Returns
+        -------
+        pl.DataFrame
+            The horizons (sorted) with ``state_occupancy_probability_{k}``
+            and ``estimate_origin``, the point estimates of
+            :func:`predict_aj_estimates`. Variance, interval and
+            ``coarsening_error_bound`` columns are not carried.
+        """
+
+        fixed_time_horizons = pl.Series("times", fixed_time_horizons).sort()
+        occupancy = self.predict_numpy(fixed_time_horizons.to_numpy())
+
+        return pl.DataFrame(
+            [
+                fixed_time_horizons,
+                *(
+                    pl.Series(f"state_occupancy_probability_{state}", occupancy[:, i])
+                    for i, state in enumerate(self.states)
+                ),
+                pl.Series(
+                    "estimate_origin",
+                    ["fixed_time_horizons"] * len(fixed_time_horizons),
+                    dtype=pl.Enum(["fixed_time_horizons", "event_table"]),
+                ),
+            ]
+        )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+import polars as pl
+
+
+def as_times_and_reals(
+    data: Any, times: str = "times", reals: str = "reals"
+) -> pl.DataFrame | pl.LazyFrame:
+    """Wrap ``data`` as a Polars frame with ``times`` and ``reals`` columns.
+
+    NumPy, Arrow and pandas buffers of numeric types are wrapped without
+    copying, so data that already lives in memory is not duplicated before
+    :func:`prepare_event_table` reads it.
+
+    Parameters
+    ----------
+    data : frame or mapping of arrays
+        A ``pl.DataFrame`` or ``pl.LazyFrame``, a ``pandas.DataFrame``, a
+        ``pyarrow.Table`` or ``pyarrow.RecordBatch`` (or any object exporting
+        an Arrow C stream), a NumPy structured array, or a mapping of column
+        names to one-dimensional NumPy, Arrow, pandas or Polars arrays.
+    times : str
+        Column of observed times, renamed to ``times``.
+    reals : str
+        Column of event types, renamed to ``reals``.
+
+    Returns
+    -------
+    pl.DataFrame or pl.LazyFrame
+        A ``pl.LazyFrame`` for a ``pl.LazyFrame`` input, a ``pl.DataFrame``
+        otherwise.
+
+    Raises
+    ------
+    TypeError
+        If ``data`` is none of the supported types.
+    """
+
+    if isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+        frame = data
+    elif _is_pandas(data):
+        frame = pl.from_pandas(data)
+    elif isinstance(data, Mapping):
+        frame = pl.DataFrame(
+            [_as_series(name, values) for name, values in data.items()]
+        )
+    elif getattr(getattr(data, "dtype", None), "names", None):
+        # A structured array is strided per field, so each field is copied.
+        frame = pl.from_numpy(data)
+    elif hasattr(data, "__arrow_c_stream__") or hasattr(data, "to_batches"):
+        frame = pl.from_arrow(data, rechunk=False)
+    else:
+        raise TypeError(
+            f"Cannot read times and reals from {type(data).__name__}; expected a "
+            "Polars, pandas or Arrow frame, a NumPy structured array or a "
+            "mapping of column names to arrays."
+        )
+
+    renames = {times: "times", reals: "reals"}
+    renames = {old: new for old, new in renames.items() if old != new}
+    return frame.rename(renames) if renames else frame
+
+
+def _as_series(name: str, values: Any) -> pl.Series:
+    if isinstance(values, pl.Series):
+        return values.alias(name)
+    if _is_pandas(values):
+        return pl.from_pandas(values).alias(name)
+    return pl.Series(name, values)
+
+
+def _is_pandas(data: Any) -> bool:
+    return type(data).__module__.split(".")[0] == "pandas"
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Any, Callable
+
+import polars as pl
+
+_RECORDER: ContextVar[StageRecorder | None] = ContextVar(
+    "polarstate_stage_recorder", default=None
+)
+
+
+class StageRecorder:
+    """Record wall time, rows and memory of every pipeline stage.
+
+    Use it as a context manager around calls to :func:`prepare_event_table`,
+    :func:`predict_aj_estimates` and friends::
+
+        with StageRecorder() as recorder:
+            event_table = prepare_event_table(times_and_reals)
+        recorder.to_frame()
+
+    While a recorder is active, every stage wrapped by :func:`run_stage` is
+    materialized on its own, so lazy plans are no longer fused across
+    stages and the timings add up to more than an unrecorded run. Without
+    an active recorder a stage costs one ``ContextVar`` lookup.
+
+    The recorder is bound to the current thread (or task) context.
+
+    Parameters
+    ----------
+    explain : bool
+        Also store the optimized Polars query plan of every stage whose
+        input is a ``pl.LazyFrame``.
+    """
+
+    def __init__(self, explain: bool = False) -> None:
+        self.explain = explain
+        self.records: list[dict[str, Any]] = []
+
+    def __enter__(self) -> StageRecorder:
+        self._token = _RECORDER.set(self)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        _RECORDER.reset(self._token)
+
+    def to_frame(self) -> pl.DataFrame:
+        """The recorded stages in call order.
+
+        Returns
+        -------
+        pl.DataFrame
+            One row per stage with ``stage``, ``seconds``, ``input_rows``,
+            ``output_rows``, ``estimated_bytes`` (of the output) and
+            ``plan``.
+        """
+
+        return pl.DataFrame(
+            self.records,
+            schema={
+                "stage": pl.String,
+                "seconds": pl.Float64,
+                "input_rows": pl.Int64,
+                "output_rows": pl.Int64,
+                "estimated_bytes": pl.Int64,
+                "plan": pl.String,
+            },
+        )
+
+
+def run_stage(
+    frame: Any,
+    func: Callable[..., Any],
+    *args: Any,
+    stage: str | None = None,
+    **kwargs: Any,
+) -> Any:
+    """Apply ``func(frame, *args, **kwargs)`` as a recorded pipeline stage.
+
+    Without an active :class:`StageRecorder` this is a plain call. With one,
+    a ``pl.LazyFrame`` input (and any ``pl.LazyFrame`` in ``args``) is
+    collected first, ``func`` runs once on the collected frame (lazily again
+    for a lazy input, so its plan can be explained), and its output is
+    recorded and returned lazily again.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame or pl.LazyFrame
+        The stage input.
+    func : callable
+        The stage.
+    stage : str, optional
+        The recorded stage name. Defaults to ``func.__name__``.
+
+    Returns
+    -------
+    The output of ``func``.
+    """
+
+    recorder = _RECORDER.get()
+    if recorder is None:
+        return func(frame, *args, **kwargs)
+
+    lazy = isinstance(frame, pl.LazyFrame)
+    if lazy:
+        frame = frame.collect()
+    args = tuple(
+        arg.collect() if isinstance(arg, pl.LazyFrame) else arg for arg in args
+    )
+
+    plan = None
+    start = time.perf_counter()
+    output = func(frame.lazy() if lazy else frame, *args, **kwargs)
+    if isinstance(output, pl.LazyFrame):
+        if recorder.explain:
+            explained = time.perf_counter()
+            plan = output.explain()
+            start += time.perf_counter() - explained
+        output = output.collect()
+    seconds = time.perf_counter() - start
+
+    recorder.records.append(
+        {
+            "stage": stage or func.__name__,
+            "seconds": seconds,
+            "input_rows": frame.height,
+            "output_rows": output.height,
+            "estimated_bytes": output.estimated_size(),
+            "plan": plan,
+        }
+    )
+    return output.lazy() if lazy else output
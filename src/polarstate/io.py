@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import polars as pl
+
+from .aj import By, _by_columns
+
+SCHEMA_VERSION = 1
+
+_METADATA_PREFIX = "polarstate."
+
+# Rows hashed per slice by input_sha256.
+_HASH_SLICE_ROWS = 1 << 20
+
+
+def save_event_table(
+    event_table: pl.DataFrame,
+    path: str | Path,
+    times_and_reals: pl.DataFrame | None = None,
+    by: By = None,
+    format: str | None = None,
+) -> None:
+    """Save an event table with provenance metadata.
+
+    Arrow IPC files (``.arrow``, ``.ipc`` or ``.feather``) are written
+    uncompressed in a single chunk, so :func:`load_event_table` can
+    memory-map them and worker processes share one physical copy of the
+    table. Parquet files (``.parquet``) are smaller but are decoded on load.
+
+    Parameters
+    ----------
+    event_table : pl.DataFrame
+        The event table created by :func:`prepare_event_table`.
+    path : str or Path
+        The file to write.
+    times_and_reals : pl.DataFrame, optional
+        The input the table was built from. When given, its row count and a
+        SHA-256 hash of its content are stored, see :func:`input_sha256`.
+    by : str or sequence of str, optional
+        Stratum columns of a stratified ``event_table``.
+    format : {"ipc", "parquet"}, optional
+        File format. Inferred from the file extension when omitted.
+    """
+
+    pa = _import_pyarrow()
+
+    metadata = {"schema_version": SCHEMA_VERSION, "by": _by_columns(by)}
+    if times_and_reals is not None:
+        metadata["input_rows"] = times_and_reals.height
+        metadata["input_sha256"] = input_sha256(times_and_reals)
+
+    table = event_table.to_arrow().combine_chunks()
+    table = table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            **{
+                f"{_METADATA_PREFIX}{key}": json.dumps(value)
+                for key, value in metadata.items()
+            },
+        }
+    )
+
+    if _format(path, format) == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+        return
+
+    with pa.ipc.new_file(str(path), table.schema) as writer:
+        writer.write_table(table)
+
+
+def load_event_table(
+    path: str | Path,
+    format: str | None = None,
+    times_and_reals: pl.DataFrame | None = None,
+) -> pl.DataFrame:
+    """Load an event table saved by :func:`save_event_table`.
+
+    Arrow IPC files are memory-mapped and wrapped without copying, so the
+    returned frame can be passed to :func:`predict_aj_estimates` directly.
+
+    Parameters
+    ----------
+    path : str or Path
+        The file to read.
+    format : {"ipc", "parquet"}, optional
+        File format. Inferred from the file extension when omitted.
+    times_and_reals : pl.DataFrame, optional
+        When given, the stored input hash must match this input's hash.
+
+    Returns
+    -------
+    pl.DataFrame
+        The event table.
+
+    Raises
+    ------
+    ValueError
+        If the file was written by a newer schema version, or if
+        ``times_and_reals`` differs from the stored input.
+    """
+
+    pa = _import_pyarrow()
+
+    if _format(path, format) == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+    metadata = _metadata(table.schema)
+    if metadata.get("schema_version", 0) > SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} has event table schema version {metadata['schema_version']}; "
+            f"this polarstate reads up to version {SCHEMA_VERSION}."
+        )
+    if times_and_reals is not None and metadata.get("input_sha256") != input_sha256(
+        times_and_reals
+    ):
+        raise ValueError(f"{path} was not built from the given times_and_reals.")
+
+    return pl.from_arrow(table, rechunk=False)
+
+
+def read_event_table_metadata(path: str | Path, format: str | None = None) -> dict:
+    """Read the metadata stored by :func:`save_event_table` without the data.
+
+    Parameters
+    ----------
+    path : str or Path
+        The file to read.
+    format : {"ipc", "parquet"}, optional
+        File format. Inferred from the file extension when omitted.
+
+    Returns
+    -------
+    dict
+        ``schema_version``, ``by`` and, when the input was given on save,
+        ``input_rows`` and ``input_sha256``.
+    """
+
+    pa = _import_pyarrow()
+
+    if _format(path, format) == "parquet":
+        import pyarrow.parquet as pq
+
+        return _metadata(pq.read_schema(path))
+    return _metadata(pa.ipc.open_file(pa.memory_map(str(path), "r")).schema)
+
+
+def input_sha256(times_and_reals: pl.DataFrame) -> str:
+    """SHA-256 of the column names, types and values of the input.
+
+    The values are hashed straight from their NumPy buffers in slices of
+    ``_HASH_SLICE_ROWS`` rows, so no serialized copy of the input is made
+    and the hash depends neither on a file format nor on the slice size.
+    Every column contributes its null mask and its physical values (strings
+    as their byte lengths and bytes). The hash depends on row order and
+    column types, which also determine the event table.
+    """
+
+    digest = hashlib.sha256()
+    for name, dtype in times_and_reals.schema.items():
+        column = times_and_reals.get_column(name)
+        streams = [hashlib.sha256() for _ in range(3)]
+        for offset in range(0, len(column), _HASH_SLICE_ROWS):
+            values = column.slice(offset, _HASH_SLICE_ROWS)
+            buffers = [values.is_null().to_numpy(), *_column_buffers(values)]
+            for stream, buffer in zip(streams, buffers):
+                stream.update(buffer)
+        digest.update(f"{name}:{dtype}\n".encode())
+        for stream in streams:
+            digest.update(stream.digest())
+    return digest.hexdigest()
+
+
+def _column_buffers(column: pl.Series) -> list[Any]:
+    if column.dtype == pl.Boolean:
+        return [column.fill_null(False).to_numpy()]
+    if column.dtype.is_numeric() or column.dtype.is_temporal():
+        return [np.ascontiguousarray(column.to_physical().fill_null(0).to_numpy())]
+    strings = column.cast(pl.String).fill_null("")
+    return [
+        strings.str.len_bytes().to_numpy(),
+        strings.str.join("").item().encode(),
+    ]
+
+
+def _metadata(schema: Any) -> dict:
+    return {
+        key.decode()[len(_METADATA_PREFIX) :]: json.loads(value)
+        for key, value in (schema.metadata or {}).items()
+        if key.decode().startswith(_METADATA_PREFIX)
+    }
+
+
+def _format(path: str | Path, format: str | None) -> str:
+    if format is None:
+        format = Path(path).suffix.lstrip(".").lower()
+    if format in ("ipc", "arrow", "feather"):
+        return "ipc"
+    if format == "parquet":
+        return "parquet"
+    raise ValueError(
+        f"Cannot store event tables as {format!r}; expected 'ipc' or 'parquet'."
+    )
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError(
+            "Saving and loading event tables requires pyarrow; "
+            "install polarstate[arrow]."
+        ) from None
+    return pa
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import numpy as np
+import polars as pl
+
+from .aj import prepare_event_table
+from .bootstrap import _CHUNK_ELEMENTS
+
+
+def time_dependent_auc(
+    times_and_reals: pl.DataFrame,
+    predictions: str,
+    fixed_time_horizons: pl.Series,
+    cause: int = 1,
+) -> pl.DataFrame:
+    """Inverse-probability-of-censoring weighted time-dependent AUC.
+
+    Cases at horizon ``h`` are subjects with ``cause`` at or before ``h``.
+    Controls are subjects still event-free at ``h`` and subjects with a
+    competing event at or before ``h``. Subjects censored before ``h`` get
+    weight zero and the others are weighted by the inverse of the censoring
+    survival, see :func:`censoring_survival`.
+
+    Subjects are sorted by prediction once. For every horizon the case and
+    control weights are summed per tied prediction with
+    ``np.add.reduceat``, so each horizon costs a linear pass instead of a
+    sort.
+
+    Parameters
+    ----------
+    times_and_reals : pl.DataFrame
+        A Polars DataFrame containing ``times``, ``reals`` and the
+        ``predictions`` column, one row per subject.
+    predictions : str
+        Column with the predicted risk of ``cause``.
+    fixed_time_horizons : pl.Series
+        Times at which to evaluate the AUC.
+    cause : int
+        The event of interest.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per horizon with ``times`` and ``auc``.
+    """
+
+    times, reals, risk, horizons = _evaluation_arrays(
+        times_and_reals, predictions, fixed_time_horizons
+    )
+    before, after = _ipcw_weights(times_and_reals, times, horizons)
+
+    order = np.argsort(risk, kind="stable")
+    times, reals, before = times[order], reals[order], before[order]
+    sorted_risk = risk[order]
+    tie_starts = np.flatnonzero(np.r_[True, sorted_risk[1:] != sorted_risk[:-1]])
+
+    is_case = reals == cause
+    is_competing = (reals != 0) & ~is_case
+
+    auc = np.empty(len(horizons))
+    chunk = max(1, _CHUNK_ELEMENTS // max(len(times), 1))
+    for start in range(0, len(horizons), chunk):
+        stop = start + chunk
+        observed = times[None, :] <= horizons[start:stop, None]
+        cases = np.where(observed & is_case, before, 0.0)
+        controls = np.where(
+            observed, np.where(is_competing, before, 0.0), after[start:stop, None]
+        )
+
+        cases = np.add.reduceat(cases, tie_starts, axis=1)
+        controls = np.add.reduceat(controls, tie_starts, axis=1)
+        controls_below = np.cumsum(controls, axis=1) - controls
+
+        concordant = (cases * (controls_below + controls / 2)).sum(axis=1)
+        pairs = cases.sum(axis=1) * controls.sum(axis=1)
+        auc[start:stop] = np.divide(
+            concordant, pairs, out=np.full(len(pairs), np.nan), where=pairs > 0
+        )
+
+    return pl.DataFrame(
+        [pl.Series("times", fixed_time_horizons), pl.Series("auc", auc)]
+    )
+
+
+def brier_score(
+    times_and_reals: pl.DataFrame,
+    predictions: str,
+    fixed_time_horizons: pl.Series,
+    cause: int = 1,
+) -> pl.DataFrame:
+    """Inverse-probability-of-censoring weighted Brier score.
+
+    The squared error of the predicted risk against the status of ``cause``
+    at each horizon, with the same weights as :func:`time_dependent_auc`.
+    Subjects are sorted by time once and the weighted errors are prefix
+    sums, so each horizon costs a binary search.
+
+    Parameters
+    ----------
+    times_and_reals : pl.DataFrame
+        A Polars DataFrame containing ``times``, ``reals`` and the
+        ``predictions`` column, one row per subject.
+    predictions : str
+        Column with the predicted risk of ``cause``.
+    fixed_time_horizons : pl.Series
+        Times at which to evaluate the Brier score.
+    cause : int
+        The event of interest.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per horizon with ``times`` and ``brier_score``.
+    """
+
+    times, reals, risk, horizons = _evaluation_arrays(
+        times_and_reals, predictions, fixed_time_horizons
+    )
+    before, after = _ipcw_weights(times_and_reals, times, horizons)
+
+    order = np.argsort(times, kind="stable")
+    times, reals, risk, before = times[order], reals[order], risk[order], before[order]
+
+    # Errors of subjects with an event at or before the horizon, and the
+    # squared predictions of subjects still event-free after it.
+    observed_error = np.where(
+        reals == cause, (1 - risk) ** 2, np.where(reals != 0, risk**2, 0.0)
+    )
+    observed_error = np.r_[0.0, np.cumsum(before * observed_error)]
+    remaining_error = np.r_[np.cumsum((risk**2)[::-1])[::-1], 0.0]
+
+    index = np.searchsorted(times, horizons, side="right")
+    brier = (observed_error[index] + after * remaining_error[index]) / len(times)
+
+    return pl.DataFrame(
+        [pl.Series("times", fixed_time_horizons), pl.Series("brier_score", brier)]
+    )
+
+
+def censoring_survival(times_and_reals: pl.DataFrame) -> pl.DataFrame:
+    """Kaplan-Meier estimate of the censoring distribution.
+
+    The event table is built by :func:`prepare_event_table` with censoring as
+    the only event and every event treated as censored, so
+    ``overall_survival`` is ``G(t)`` and ``previous_overall_survival`` is
+    ``G(t-)``.
+
+    Parameters
+    ----------
+    times_and_reals : pl.DataFrame
+        A Polars DataFrame containing at least ``times`` and ``reals``.
+
+    Returns
+    -------
+    pl.DataFrame
+        The censoring event table.
+    """
+
+    return prepare_event_table(
+        times_and_reals.select(
+            "times", (pl.col("reals") == 0).cast(pl.Int64).alias("reals")
+        ),
+        causes=[1],
+    )
+
+
+def _evaluation_arrays(
+    times_and_reals: pl.DataFrame,
+    predictions: str,
+    fixed_time_horizons: pl.Series,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    return (
+        times_and_reals.get_column("times").to_numpy(),
+        times_and_reals.get_column("reals").to_numpy(),
+        times_and_reals.get_column(predictions).cast(pl.Float64).to_numpy(),
+        pl.Series(fixed_time_horizons).to_numpy(),
+    )
+
+
+def _ipcw_weights(
+    times_and_reals: pl.DataFrame, times: np.ndarray, horizons: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Weights ``1 / G(T-)`` per subject and ``1 / G(h)`` per horizon.
+
+    Censored subjects get weight zero; they only enter through ``G(h)``.
+    """
+
+    censoring = censoring_survival(times_and_reals)
+    censoring_times = censoring.get_column("times").to_numpy()
+    survival = np.r_[1.0, censoring.get_column("overall_survival").to_numpy()]
+    previous_survival = censoring.get_column("previous_overall_survival").to_numpy()
+
+    subject_survival = previous_survival[np.searchsorted(censoring_times, times)]
+    reals = times_and_reals.get_column("reals").to_numpy()
+    before = np.divide(
+        1.0,
+        subject_survival,
+        out=np.zeros(len(times)),
+        where=(subject_survival > 0) & (reals != 0),
+    )
+
+    horizon_survival = survival[np.searchsorted(censoring_times, horizons, "right")]
+    after = np.divide(
+        1.0,
+        horizon_survival,
+        out=np.zeros(len(horizons)),
+        where=horizon_survival > 0,
+    )
+    return before, after
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import numpy as np
+import polars as pl
+
+# Number of transition matrices multiplied together per prefix-product block.
+_BLOCK_SIZE = 1024
+
+
+def prepare_multistate_table(
+    transitions: pl.DataFrame | pl.LazyFrame,
+    subject: str = "id",
+    from_state: str = "from_state",
+    to_state: str = "to_state",
+    times: str = "times",
+) -> pl.DataFrame:
+    """General Aalen-Johansen estimate of state occupancy in a multi-state model.
+
+    Every row of ``transitions`` is one sojourn of a subject: it is in
+    ``from_state`` from its previous row's time (or from time 0) until
+    ``times``, when it moves to ``to_state``, or is censored when
+    ``to_state`` is null. Subjects start in the ``from_state`` of their
+    first row.
+
+    The numbers at risk per state come from a sweep line over the sorted
+    entry and exit times, the per-time transition counts from one
+    ``np.bincount`` over (time, from, to) cells, and the product integral ``prod_t (I + dA(t))`` from
+    batched NumPy matrix products (a Hillis-Steele prefix product within
+    blocks of ``_BLOCK_SIZE`` times, chained across blocks).
+
+    Parameters
+    ----------
+    transitions : pl.DataFrame or pl.LazyFrame
+        One row per sojourn with integer states, one of which is 0.
+    subject : str
+        Column identifying subjects.
+    from_state : str
+        Column with the state occupied during the sojourn.
+    to_state : str
+        Column with the state entered at ``times``, null for censoring.
+    times : str
+        Column with the end of the sojourn.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per unique transition time with ``at_risk_{s}`` for every
+        state and ``state_occupancy_probability_{s}_at_times`` for every
+        state other than 0, so the table can be passed to
+        :func:`predict_aj_estimates`, which derives state 0 as the
+        remainder.
+
+    Raises
+    ------
+    ValueError
+        If no state is labelled 0.
+    """
+
+    sojourns = (
+        transitions.lazy()
+        .select(
+            pl.col(subject).alias("id"),
+            pl.col(from_state).alias("from_state"),
+            pl.col(to_state).alias("to_state"),
+            pl.col(times).alias("times"),
+        )
+        .sort("id", "times")
+        .with_columns(
+            pl.col("times").shift(1).over("id").fill_null(0).alias("entry_times"),
+            (pl.int_range(pl.len()).over("id") == 0).alias("first"),
+        )
+        .collect()
+    )
+
+    states = np.unique(
+        np.concatenate(
+            [
+                sojourns.get_column("from_state").to_numpy(),
+                sojourns.get_column("to_state").drop_nulls().to_numpy(),
+            ]
+        )
+    )
+    if 0 not in states:
+        raise ValueError(
+            "State 0 is derived as the remainder of the other states, so the "
+            f"states must include 0; found {states.tolist()}."
+        )
+    n_states = len(states)
+    origin = np.searchsorted(states, sojourns.get_column("from_state").to_numpy())
+
+    moves = sojourns.filter(pl.col("to_state").is_not_null())
+    event_times = np.unique(moves.get_column("times").to_numpy())
+    counts = np.bincount(
+        (
+            np.searchsorted(event_times, moves.get_column("times").to_numpy())
+            * n_states
+            + np.searchsorted(states, moves.get_column("from_state").to_numpy())
+        )
+        * n_states
+        + np.searchsorted(states, moves.get_column("to_state").to_numpy()),
+        minlength=len(event_times) * n_states * n_states,
+    ).reshape(len(event_times), n_states, n_states)
+
+    # A sojourn is at risk at t when its entry time is before t and its exit
+    # time is at or after t.
+    entry_times = sojourns.get_column("entry_times").to_numpy()
+    exit_times = sojourns.get_column("times").to_numpy()
+    at_risk = np.column_stack(
+        [
+            np.searchsorted(np.sort(entry_times[origin == s]), event_times)
+            - np.searchsorted(np.sort(exit_times[origin == s]), event_times)
+            for s in range(n_states)
+        ]
+    )
+
+    # I + dA(t): off-diagonal hazards, rows summing to one.
+    diagonal = np.arange(n_states)
+    counts[:, diagonal, diagonal] = 0
+    transition_matrices = np.divide(
+        counts,
+        at_risk[:, :, None],
+        out=np.zeros(counts.shape),
+        where=at_risk[:, :, None] > 0,
+    )
+    transition_matrices[:, diagonal, diagonal] = 1 - transition_matrices.sum(axis=2)
+
+    first = sojourns.get_column("first").to_numpy()
+    initial = np.bincount(origin[first], minlength=n_states) / first.sum()
+    occupancy = initial @ _prefix_products(transition_matrices)
+
+    return pl.DataFrame(
+        [
+            pl.Series("times", event_times),
+            *(
+                pl.Series(f"at_risk_{state}", at_risk[:, s])
+                for s, state in enumerate(states)
+            ),
+            *(
+                pl.Series(
+                    f"state_occupancy_probability_{state}_at_times", occupancy[:, s]
+                )
+                for s, state in enumerate(states)
+                if state != 0
+            ),
+        ]
+    )
+
+
+def _prefix_products(matrices: np.ndarray) -> np.ndarray:
+    """Running products ``M_1, M_1 M_2, ..., M_1 ... M_T`` of ``(T, K, K)``."""
+
+    products = np.empty_like(matrices)
+    carry = np.eye(matrices.shape[1])
+    for start in range(0, len(matrices), _BLOCK_SIZE):
+        block = matrices[start : start + _BLOCK_SIZE]
+        step = 1
+        while step < len(block):
+            block = np.concatenate([block[:step], block[:-step] @ block[step:]])
+            step *= 2
+        products[start : start + len(block)] = carry @ block
+        carry = products[start + len(block) - 1]
+    return products
@@ -0,0 +1,135 @@
+"""Polars ``aj`` namespaces on expressions, DataFrames and LazyFrames.
+
+Importing :mod:`polarstate` registers them::
+
+    df.group_by("site").agg(pl.col("times").aj.cif(pl.col("reals"), 365))
+    lf.aj.event_table(by="site")
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, Union
+
+import numpy as np
+import polars as pl
+
+from .aj import prepare_event_table
+from .predict import predict_aj_estimates
+
+Horizons = Union[float, Sequence[float], np.ndarray, pl.Series]
+
+
+@pl.api.register_expr_namespace("aj")
+class AalenJohansenExpr:
+    """Aalen-Johansen estimates as expressions on a ``times`` column.
+
+    The estimates are built from sort, cumulative and ``search_sorted``
+    expressions only, so they run per group inside ``group_by().agg()`` and
+    ``over()`` as part of the surrounding query. Rows are ordered by time
+    with events before censorings at tied times; with ``n - i`` subjects at
+    risk at row ``i``, the per-row factors ``1 - 1 / (n - i)`` of the tied
+    events multiply to the per-time factor ``1 - d / Y``.
+    """
+
+    def __init__(self, expr: pl.Expr) -> None:
+        self._times = expr
+
+    def cif(self, reals: pl.Expr | str, horizons: Horizons, cause: int = 1) -> pl.Expr:
+        """Cumulative incidence of ``cause`` at ``horizons``.
+
+        Parameters
+        ----------
+        reals : pl.Expr or str
+            Event types, 0 for censoring.
+        horizons : float or 1-D array-like of float
+            Times at which to evaluate the cumulative incidence. A single
+            horizon gives one value per group, several give one per horizon.
+        cause : int
+            The event of interest.
+
+        Returns
+        -------
+        pl.Expr
+        """
+
+        times, reals, at_risk = self._sorted(reals)
+        survival = self._factors(reals, at_risk).cum_prod().shift(1, fill_value=1.0)
+        incidence = (
+            pl.when(reals == cause).then(survival / at_risk).otherwise(0.0).cum_sum()
+        )
+        return self._at(times, incidence, horizons, 0.0)
+
+    def survival(self, reals: pl.Expr | str, horizons: Horizons) -> pl.Expr:
+        """Overall survival (state 0 occupancy) at ``horizons``.
+
+        Parameters
+        ----------
+        reals : pl.Expr or str
+            Event types, 0 for censoring.
+        horizons : float or 1-D array-like of float
+            Times at which to evaluate the survival.
+
+        Returns
+        -------
+        pl.Expr
+        """
+
+        times, reals, at_risk = self._sorted(reals)
+        survival = self._factors(reals, at_risk).cum_prod()
+        return self._at(times, survival, horizons, 1.0)
+
+    def _sorted(self, reals: pl.Expr | str) -> tuple[pl.Expr, pl.Expr, pl.Expr]:
+        if isinstance(reals, str):
+            reals = pl.col(reals)
+        keys = [self._times, reals == 0]
+        at_risk = pl.len() - pl.int_range(pl.len())
+        return self._times.sort_by(keys), reals.sort_by(keys), at_risk
+
+    @staticmethod
+    def _factors(reals: pl.Expr, at_risk: pl.Expr) -> pl.Expr:
+        return pl.when(reals != 0).then(1 - 1 / at_risk).otherwise(1.0)
+
+    @staticmethod
+    def _at(
+        times: pl.Expr, values: pl.Expr, horizons: Horizons, initial: float
+    ) -> pl.Expr:
+        single = not isinstance(horizons, pl.Series) and np.ndim(horizons) == 0
+        horizons = pl.lit(pl.Series([horizons] if single else horizons))
+        # Number of rows at or before each horizon.
+        rows = times.search_sorted(horizons, side="right").cast(pl.Int64)
+        estimate = (
+            pl.when(rows > 0).then(values.gather((rows - 1).clip(0))).otherwise(initial)
+        )
+        return estimate.first() if single else estimate
+
+
+@pl.api.register_dataframe_namespace("aj")
+class AalenJohansenFrame:
+    """``df.aj.event_table()`` and ``df.aj.predict()``."""
+
+    def __init__(self, df: pl.DataFrame) -> None:
+        self._df = df
+
+    def event_table(self, **kwargs: Any) -> pl.DataFrame:
+        """The event table, see :func:`prepare_event_table`."""
+
+        return prepare_event_table(self._df, **kwargs)
+
+    def predict(self, fixed_time_horizons: pl.Series, **kwargs: Any) -> pl.DataFrame:
+        """Predict from this event table, see :func:`predict_aj_estimates`."""
+
+        return predict_aj_estimates(self._df, fixed_time_horizons, **kwargs)
+
+
+@pl.api.register_lazyframe_namespace("aj")
+class AalenJohansenLazyFrame:
+    """``lf.aj.event_table()`` returning the uncollected plan."""
+
+    def __init__(self, lf: pl.LazyFrame) -> None:
+        self._lf = lf
+
+    def event_table(self, **kwargs: Any) -> pl.LazyFrame:
+        """The event table plan, see :func:`prepare_event_table`."""
+
+        return prepare_event_table(self._lf, **kwargs)
@@ -1,10 +1,23 @@
+from __future__ import annotations
+
+from statistics import NormalDist
+
 import polars as pl
 
+from .aj import By, _by_columns, _occupied_states
+from .bootstrap import bootstrap_aj_estimates
+from .instrument import run_stage
+
 
 def predict_aj_estimates(
     event_table: pl.DataFrame,
     fixed_time_horizons: pl.Series,
     full_event_table: bool = False,
+    by: By = None,
+    n_bootstrap: int | None = None,
+    confidence_level: float = 0.95,
+    seed: int | None = None,
+    n_jobs: int | None = None,
 ) -> pl.DataFrame:
     """Predict state-occupancy probabilities at ``fixed_time_horizons``.
 
@@ -14,23 +27,80 @@ def predict_aj_estimates(
         The event table created by :func:`prepare_event_table`.
     fixed_time_horizons : pl.Series
         Times at which to obtain the state-occupancy probabilities.
+    by : str or sequence of str, optional
+        Stratum columns of a stratified ``event_table``. Every stratum is
+        predicted at every horizon with a single ``join_asof``.
+    n_bootstrap : int, optional
+        Number of bootstrap replicates. When given, percentile intervals are
+        added, see :func:`bootstrap_aj_estimates`.
+    confidence_level : float
+        Coverage of the log-log or bootstrap intervals.
+    seed : int, optional
+        Seed for reproducible bootstrap replicates.
+    n_jobs : int, optional
+        Number of bootstrap worker threads. Defaults to the number of CPUs.
 
     Returns
     -------
     pl.DataFrame
         DataFrame with ``fixed_time_horizons`` and the estimated probabilities
-        for states 0, 1 and 2.
+        for state 0 and every cause of the event table (1 and 2 by default).
+        When ``n_bootstrap`` is given, ``state_occupancy_probability_{k}_lower``
+        and ``_upper`` columns hold the bootstrap intervals. When the event
+        table has variance columns (see :func:`add_variance_columns`) they are
+        carried to the horizons as ``state_occupancy_probability_{k}_variance``
+        with pointwise log-log ``_lower`` and ``_upper`` confidence intervals.
+        An event table built on a time grid adds its
+        ``coarsening_error_bound``, which is null at horizons that are not
+        times of the table.
     """
 
+    with_variance = "overall_survival_variance" in event_table.columns
+    if with_variance and n_bootstrap is not None:
+        raise ValueError(
+            "Use either the variance columns of the event table or n_bootstrap "
+            "for confidence intervals, not both."
+        )
+    if n_bootstrap is not None and "count_0" not in event_table.columns:
+        raise ValueError(
+            "n_bootstrap needs the count columns, which compact event tables "
+            "do not have."
+        )
+
     estimate_origin_enum = pl.Enum(["fixed_time_horizons", "event_table"])
 
-    event_table = event_table.sort("times")
+    by = _by_columns(by)
 
-    horizons_df = pl.DataFrame({"times": fixed_time_horizons}).sort("times")
+    event_table = run_stage(
+        event_table, pl.DataFrame.sort, [*by, "times"], stage="sort_event_table"
+    )
 
-    joined = horizons_df.join_asof(
-        event_table, left_on="times", right_on="times"
-    ).with_columns(
+    horizons_df = pl.DataFrame({"times": fixed_time_horizons})
+
+    if by:
+        horizons_df = (
+            event_table.select(by)
+            .unique(maintain_order=True)
+            .join(horizons_df, how="cross")
+        )
+
+    horizons_df = horizons_df.sort([*by, "times"])
+
+    coarsened = "coarsening_error_bound" in event_table.columns
+    if coarsened:
+        event_table = event_table.with_columns(pl.col("times").alias("_table_times"))
+
+    joined = run_stage(
+        horizons_df,
+        pl.DataFrame.join_asof,
+        event_table,
+        on="times",
+        by=by or None,
+        check_sortedness=not by,
+        stage="join_asof",
+    )
+
+    joined = joined.with_columns(
         pl.lit("fixed_time_horizons")
         .cast(estimate_origin_enum)
         .alias("estimate_origin")
@@ -49,29 +119,103 @@ def predict_aj_estimates(
             how="vertical",
         )
 
+    causes = _occupied_states(event_table)
+    states = [0, *causes]
+
     joined = joined.with_columns(
         [
-            pl.col("state_occupancy_probability_1_at_times")
-            .fill_null(0.0)
-            .alias("state_occupancy_probability_1"),
-            pl.col("state_occupancy_probability_2_at_times")
+            pl.col(f"state_occupancy_probability_{cause}_at_times")
             .fill_null(0.0)
-            .alias("state_occupancy_probability_2"),
+            .alias(f"state_occupancy_probability_{cause}")
+            for cause in causes
         ]
     ).with_columns(
         (
             1
-            - pl.col("state_occupancy_probability_1")
-            - pl.col("state_occupancy_probability_2")
+            - pl.sum_horizontal(
+                [f"state_occupancy_probability_{cause}" for cause in causes]
+            )
         ).alias("state_occupancy_probability_0")
     )
 
-    return joined.select(
+    if coarsened:
+        # The bound only holds at the times of the table (the grid points
+        # with exits); between them exits moved to the next grid point are
+        # missing from the estimate.
+        joined = joined.with_columns(
+            pl.when(pl.col("times") == pl.col("_table_times"))
+            .then(pl.col("coarsening_error_bound"))
+            .alias("coarsening_error_bound")
+        )
+        interval_columns = ["coarsening_error_bound"]
+    else:
+        interval_columns = []
+    if with_variance:
+        joined = joined.with_columns(
+            pl.col("overall_survival_variance")
+            .fill_null(0.0)
+            .alias("state_occupancy_probability_0_variance"),
+            *(
+                pl.col(f"state_occupancy_probability_{cause}_at_times_variance")
+                .fill_null(0.0)
+                .alias(f"state_occupancy_probability_{cause}_variance")
+                for cause in causes
+            ),
+        )
+        z = NormalDist().inv_cdf(0.5 + confidence_level / 2)
+        for state in states:
+            interval_columns += [
+                f"state_occupancy_probability_{state}_variance",
+                *_log_log_interval(f"state_occupancy_probability_{state}", z),
+            ]
+
+    estimates = joined.select(
         [
+            *by,
             "times",
-            "state_occupancy_probability_0",
-            "state_occupancy_probability_1",
-            "state_occupancy_probability_2",
+            *(f"state_occupancy_probability_{state}" for state in states),
             "estimate_origin",
+            *interval_columns,
         ]
     )
+
+    if n_bootstrap is not None:
+        intervals = bootstrap_aj_estimates(
+            event_table,
+            estimates.get_column("times"),
+            n_bootstrap=n_bootstrap,
+            confidence_level=confidence_level,
+            seed=seed,
+            n_jobs=n_jobs,
+            by=by,
+        )
+        estimates = estimates.join(
+            intervals, on=[*by, "times"], how="left", maintain_order="left"
+        )
+
+    return estimates
+
+
+def _log_log_interval(column: str, z: float) -> list[pl.Expr]:
+    """Pointwise confidence interval on the log(-log) scale.
+
+    With se the square root of the variance, the bounds are
+    p ** exp(+-z * se / (p * |log p|)), which always lie in [0, 1]. Where p is
+    0 or 1 the interval collapses to p.
+    """
+
+    estimate = pl.col(column)
+    scale = (
+        z * pl.col(f"{column}_variance").sqrt() / (estimate * estimate.log().abs())
+    ).exp()
+    inside = (estimate > 0) & (estimate < 1)
+    return [
+        pl.when(inside)
+        .then(estimate.pow(scale))
+        .otherwise(estimate)
+        .alias(f"{column}_lower"),
+        pl.when(inside)
+        .then(estimate.pow(1 / scale))
+        .otherwise(estimate)
+        .alias(f"{column}_upper"),
+    ]
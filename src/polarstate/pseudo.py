@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import numpy as np
+import polars as pl
+
+from .aj import Causes, _causes, prepare_event_table
+
+
+def pseudo_observations(
+    times_and_reals: pl.DataFrame,
+    fixed_time_horizons: pl.Series,
+    causes: Causes = None,
+) -> pl.DataFrame:
+    """Jackknife pseudo-observations of the state-occupancy probabilities.
+
+    The pseudo-observation of subject ``i`` at horizon ``h`` is
+    ``n * theta(h) - (n - 1) * theta_{-i}(h)``, where ``theta_{-i}`` is the
+    Aalen-Johansen estimate without subject ``i``. Leaving out a subject
+    observed at the ``m``-th unique time lowers ``at_risk`` by one at and
+    before that time and one ``count_*`` cell at that time, and leaves every
+    later hazard unchanged. So each leave-one-out estimate is read from two
+    prefix sequences of the full event table, the original one and one with
+    ``at_risk - 1``, instead of refitting ``n`` event tables.
+
+    Parameters
+    ----------
+    times_and_reals : pl.DataFrame
+        A Polars DataFrame containing at least ``times`` and ``reals``
+        columns, one row per subject.
+    fixed_time_horizons : pl.Series
+        Times at which to obtain the pseudo-observations.
+    causes : sequence of int, pl.Enum or "infer", optional
+        The competing causes, see :func:`group_reals_by_times`.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per subject and horizon with ``row_index`` (the row of
+        ``times_and_reals``), ``times`` and a
+        ``state_occupancy_probability_{k}`` column for state 0 and every cause.
+    """
+
+    if isinstance(times_and_reals, pl.LazyFrame):
+        times_and_reals = times_and_reals.collect()
+
+    event_table = prepare_event_table(times_and_reals, causes=causes)
+    event_causes = _causes(event_table)
+
+    times = event_table.get_column("times").to_numpy()
+    at_risk = event_table.get_column("at_risk").to_numpy().astype(np.float64)
+    counts = np.column_stack(
+        [
+            event_table.get_column(f"count_{cause}").to_numpy().astype(np.float64)
+            for cause in event_causes
+        ]
+    )
+
+    # Row 0 of each sequence holds the estimate before the first observed time.
+    survival, incidence = _aalen_johansen(counts, at_risk)
+    survival_minus, incidence_minus = _aalen_johansen(counts, at_risk - 1)
+
+    reals = times_and_reals.get_column("reals")
+    if isinstance(causes, pl.Enum):
+        reals = reals.cast(causes).to_physical()
+    reals = reals.to_numpy()
+    subject_times = times_and_reals.get_column("times").to_numpy()
+
+    # Position of each subject's time and event in the event table. Subjects
+    # whose ``reals`` is neither 0 nor a counted cause are not in the table.
+    row = np.searchsorted(times, subject_times)
+    event = np.full(len(reals), -1)
+    for i, cause in enumerate(event_causes):
+        event[reals == cause] = i
+    counted = (event >= 0) | (reals == 0)
+    n = counted.sum()
+
+    # Estimate just after the subject's own time with the subject removed.
+    own_counts = counts[row]
+    has_event = event >= 0
+    own_counts[has_event, event[has_event]] -= 1
+    own_at_risk = at_risk[row] - 1
+    own_hazards = np.divide(
+        own_counts,
+        own_at_risk[:, None],
+        out=np.zeros_like(own_counts),
+        where=own_at_risk[:, None] > 0,
+    )
+    survival_at_own = survival_minus[row] * (1 - own_hazards.sum(axis=1))
+    incidence_at_own = incidence_minus[row] + survival_minus[row, None] * own_hazards
+
+    horizons = pl.Series("times", fixed_time_horizons)
+    horizon_row = np.searchsorted(times, horizons.to_numpy(), side="right")
+    before_own = horizon_row[None, :] <= row[:, None]
+
+    # After the subject's time the hazards are unchanged, so the remaining
+    # increments are those of the full table rescaled by the survival ratio.
+    full_survival_at_own = survival[row + 1][:, None]
+    scale = np.divide(
+        survival_at_own[:, None],
+        full_survival_at_own,
+        out=np.zeros((len(row), 1)),
+        where=full_survival_at_own > 0,
+    )
+    leave_one_out_survival = np.where(
+        before_own,
+        survival_minus[horizon_row][None, :],
+        np.where(
+            horizon_row[None, :] == row[:, None] + 1,
+            survival_at_own[:, None],
+            scale * survival[horizon_row][None, :],
+        ),
+    )
+    leave_one_out_incidence = np.where(
+        before_own[:, :, None],
+        incidence_minus[horizon_row][None, :, :],
+        incidence_at_own[:, None, :]
+        + scale[:, :, None]
+        * (incidence[horizon_row][None, :, :] - incidence[row + 1][:, None, :]),
+    )
+
+    estimates = np.concatenate(
+        [survival[horizon_row][:, None], incidence[horizon_row]], axis=1
+    )
+    leave_one_out = np.concatenate(
+        [leave_one_out_survival[:, :, None], leave_one_out_incidence], axis=2
+    )
+    leave_one_out[~counted] = estimates
+    pseudo = n * estimates[None, :, :] - (n - 1) * leave_one_out
+
+    n_subjects, n_horizons = before_own.shape
+    states = [0, *event_causes]
+    return pl.DataFrame(
+        [
+            pl.Series("row_index", np.repeat(np.arange(n_subjects), n_horizons)).cast(
+                pl.UInt32
+            ),
+            pl.Series("times", np.tile(horizons.to_numpy(), n_subjects)).cast(
+                horizons.dtype
+            ),
+            *(
+                pl.Series(
+                    f"state_occupancy_probability_{state}",
+                    pseudo[:, :, i].ravel(),
+                )
+                for i, state in enumerate(states)
+            ),
+        ]
+    )
+
+
+def _aalen_johansen(
+    counts: np.ndarray, at_risk: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Overall survival and cumulative incidences with an initial row."""
+
+    hazards = np.divide(
+        counts,
+        at_risk[:, None],
+        out=np.zeros_like(counts),
+        where=at_risk[:, None] > 0,
+    )
+    survival = np.concatenate([[1.0], np.cumprod(1 - hazards.sum(axis=1))])
+    incidence = np.vstack(
+        [
+            np.zeros((1, counts.shape[1])),
+            np.cumsum(survival[:-1, None] * hazards, axis=0),
+        ]
+    )
+    return survival, incidence
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import polars as pl
+
+from .aj import By, _by_columns, _occupied_states, _over
+
+
+def restricted_mean_time(
+    event_table: pl.DataFrame,
+    fixed_time_horizons: pl.Series,
+    by: By = None,
+) -> pl.DataFrame:
+    """Restricted mean survival time and restricted mean time lost per cause.
+
+    The restricted mean survival time up to ``h`` is the area under
+    ``overall_survival`` on ``[0, h]`` and the restricted mean time lost to
+    cause k is the area under ``state_occupancy_probability_k_at_times``.
+    Both are step functions, so the area up to every event time is a
+    cumulative sum of the previous value times the time gap, and each
+    horizon adds one partial step after a single ``join_asof``.
+
+    Parameters
+    ----------
+    event_table : pl.DataFrame
+        The event table created by :func:`prepare_event_table`. Follow-up is
+        assumed to start at time 0.
+    fixed_time_horizons : pl.Series
+        Horizons up to which to integrate.
+    by : str or sequence of str, optional
+        Stratum columns of a stratified ``event_table``.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per stratum and horizon with
+        ``restricted_mean_survival_time`` and
+        ``restricted_mean_time_lost_{k}`` for every cause k. Together they
+        add up to the horizon.
+    """
+
+    by = _by_columns(by)
+    causes = _occupied_states(event_table)
+
+    curves = {
+        "restricted_mean_survival_time": (pl.col("overall_survival"), 1.0),
+        **{
+            f"restricted_mean_time_lost_{cause}": (
+                pl.col(f"state_occupancy_probability_{cause}_at_times"),
+                0.0,
+            )
+            for cause in causes
+        },
+    }
+
+    gap = pl.col("times") - _over(pl.col("times").shift(1), by).fill_null(0)
+    areas = (
+        event_table.lazy()
+        .sort([*by, "times"])
+        .select(
+            *by,
+            pl.col("times").alias("event_times"),
+            *(value.alias(f"{name}_value") for name, (value, _) in curves.items()),
+            *(
+                _over(
+                    (_over(value.shift(1), by).fill_null(initial) * gap).cum_sum(),
+                    by,
+                ).alias(f"{name}_area")
+                for name, (value, initial) in curves.items()
+            ),
+        )
+    )
+
+    horizons = pl.LazyFrame({"times": pl.Series(fixed_time_horizons)})
+    if by:
+        horizons = (
+            event_table.lazy()
+            .select(by)
+            .unique(maintain_order=True)
+            .join(horizons, how="cross")
+        )
+
+    remaining = pl.col("times") - pl.col("event_times")
+    return (
+        horizons.sort([*by, "times"])
+        .join_asof(
+            areas,
+            left_on="times",
+            right_on="event_times",
+            by=by or None,
+            check_sortedness=not by,
+        )
+        .select(
+            *by,
+            "times",
+            *(
+                (pl.col(f"{name}_area") + pl.col(f"{name}_value") * remaining)
+                .fill_null(pl.col("times") * initial)
+                .cast(pl.Float64)
+                .alias(name)
+                for name, (_, initial) in curves.items()
+            ),
+        )
+        .collect()
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Callable, Union
+
+import polars as pl
+
+from .aj import By, Causes
+from .counts import EventCounts
+
+Source = Union[str, Path, Sequence[Union[str, Path]], pl.LazyFrame]
+
+_SCANNERS: dict[str, Callable[..., pl.LazyFrame]] = {
+    "parquet": pl.scan_parquet,
+    "csv": pl.scan_csv,
+    "ipc": pl.scan_ipc,
+    "arrow": pl.scan_ipc,
+    "feather": pl.scan_ipc,
+}
+
+
+def scan_times_and_reals(source: Source, format: str | None = None) -> pl.LazyFrame:
+    """Lazily scan ``times`` and ``reals`` from files without reading them.
+
+    Parameters
+    ----------
+    source : str, Path, sequence of those, or pl.LazyFrame
+        A file, a glob such as ``"events/*.parquet"``, a list of files, or an
+        existing ``pl.scan_*`` query which is returned unchanged.
+    format : {"parquet", "csv", "ipc"}, optional
+        File format. Inferred from the file extension when omitted.
+
+    Returns
+    -------
+    pl.LazyFrame
+        The scan of all files.
+    """
+
+    if isinstance(source, pl.LazyFrame):
+        return source
+
+    paths = [source] if isinstance(source, (str, Path)) else list(source)
+    if not paths:
+        raise ValueError("No files to scan.")
+
+    if format is None:
+        format = Path(paths[0]).suffix.lstrip(".").lower()
+
+    try:
+        scanner = _SCANNERS[format]
+    except KeyError:
+        raise ValueError(
+            f"Cannot scan format {format!r}; expected one of {sorted(_SCANNERS)}."
+        ) from None
+
+    if len(paths) == 1:
+        return scanner(paths[0])
+    return pl.concat([scanner(path) for path in paths])
+
+
+def scan_event_counts(
+    source: Source,
+    by: By = None,
+    format: str | None = None,
+    weights: str | None = None,
+    causes: Causes = None,
+) -> EventCounts:
+    """Count events per unique time in files too large to fit in memory.
+
+    The ``count_*`` aggregation runs under the streaming engine, so peak
+    memory is bounded by the number of unique times (and strata), not by the
+    number of rows scanned.
+
+    Parameters
+    ----------
+    source : str, Path, sequence of those, or pl.LazyFrame
+        See :func:`scan_times_and_reals`.
+    by : str or sequence of str, optional
+        Stratum columns.
+    format : {"parquet", "csv", "ipc"}, optional
+        File format. Inferred from the file extension when omitted.
+    weights : str, optional
+        Column of case weights, see :func:`group_reals_by_times`.
+    causes : sequence of int, pl.Enum or "infer", optional
+        The competing causes, see :func:`group_reals_by_times`.
+
+    Returns
+    -------
+    EventCounts
+        The per-time counts of every scanned row.
+    """
+
+    return EventCounts.from_times_and_reals(
+        scan_times_and_reals(source, format), by, weights, causes
+    )
+
+
+def scan_event_table(
+    source: Source,
+    by: By = None,
+    format: str | None = None,
+    weights: str | None = None,
+    causes: Causes = None,
+) -> pl.DataFrame:
+    """Generate the event table from Parquet, CSV or IPC files out of core.
+
+    Only the per-unique-time counts are materialized; the cumulative steps of
+    :func:`prepare_event_table` then run on that much smaller table.
+
+    Parameters
+    ----------
+    source : str, Path, sequence of those, or pl.LazyFrame
+        See :func:`scan_times_and_reals`.
+    by : str or sequence of str, optional
+        Stratum columns.
+    format : {"parquet", "csv", "ipc"}, optional
+        File format. Inferred from the file extension when omitted.
+    weights : str, optional
+        Column of case weights, see :func:`group_reals_by_times`.
+    causes : sequence of int, pl.Enum or "infer", optional
+        The competing causes, see :func:`group_reals_by_times`.
+
+    Returns
+    -------
+    pl.DataFrame
+        The same table :func:`prepare_event_table` returns for all rows.
+    """
+
+    return scan_event_counts(source, by, format, weights, causes).finalize()
@@ -0,0 +1,108 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.bootstrap import _state_occupancy_at
+
+
+def make_times_and_reals() -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    return pl.DataFrame(
+        {
+            "site": rng.choice(["a", "b"], 200),
+            "times": rng.integers(1, 30, 200),
+            "reals": rng.integers(0, 3, 200),
+        }
+    )
+
+
+def test_state_occupancy_at_matches_point_estimates() -> None:
+    event_table = prepare_event_table(make_times_and_reals())
+    fixed_time_horizons = pl.Series([0, 5, 12, 40])
+
+    counts = event_table.select("count_0", "count_1", "count_2").to_numpy()
+    horizon_index = (
+        np.searchsorted(
+            event_table["times"].to_numpy(), fixed_time_horizons.to_numpy(), "right"
+        )
+        - 1
+    )
+
+    result = _state_occupancy_at(counts[None], [0, 1, 2], horizon_index)[0]
+
+    expected_output = predict_aj_estimates(event_table, fixed_time_horizons).select(
+        "state_occupancy_probability_0",
+        "state_occupancy_probability_1",
+        "state_occupancy_probability_2",
+    )
+
+    np.testing.assert_allclose(result, expected_output.to_numpy())
+
+
+def test_predict_aj_estimates_bootstrap() -> None:
+    event_table = prepare_event_table(make_times_and_reals(), by="site")
+    fixed_time_horizons = pl.Series([5, 12, 40])
+
+    result = predict_aj_estimates(
+        event_table, fixed_time_horizons, by="site", n_bootstrap=200, seed=7, n_jobs=1
+    )
+
+    assert_frame_equal(
+        result,
+        predict_aj_estimates(
+            event_table,
+            fixed_time_horizons,
+            by="site",
+            n_bootstrap=200,
+            seed=7,
+            n_jobs=4,
+        ),
+    )
+    for state in (0, 1, 2):
+        estimate = result[f"state_occupancy_probability_{state}"]
+        assert (result[f"state_occupancy_probability_{state}_lower"] <= estimate).all()
+        assert (result[f"state_occupancy_probability_{state}_upper"] >= estimate).all()
+
+
+def test_bootstrap_rejects_delayed_entry() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [2, 3, 4, 5], "reals": [1, 0, 2, 1], "entry": [0, 1, 1, 2]}
+    )
+    event_table = prepare_event_table(times_and_reals, entry_times="entry")
+
+    with pytest.raises(ValueError, match="entry_times"):
+        predict_aj_estimates(event_table, pl.Series("times", [3]), n_bootstrap=10)
+
+
+def test_bootstrap_weighted_event_tables() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [1, 2, 3, 4, 5], "reals": [1, 0, 2, 1, 0], "weights": [2, 1, 3, 1, 2]}
+    )
+    horizons = pl.Series("times", [3])
+
+    frequency = predict_aj_estimates(
+        prepare_event_table(times_and_reals, weights="weights"),
+        horizons,
+        n_bootstrap=50,
+        seed=1,
+    )
+    expanded = predict_aj_estimates(
+        prepare_event_table(
+            times_and_reals.select(pl.exclude("weights").repeat_by("weights").explode())
+        ),
+        horizons,
+        n_bootstrap=50,
+        seed=1,
+    )
+    assert_frame_equal(frequency, expanded)
+
+    with pytest.raises(ValueError, match="fractional"):
+        predict_aj_estimates(
+            prepare_event_table(
+                times_and_reals.with_columns(pl.col("weights") / 3), weights="weights"
+            ),
+            horizons,
+            n_bootstrap=10,
+        )
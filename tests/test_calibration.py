@@ -0,0 +1,39 @@
+import numpy as np
+import polars as pl
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.calibration import calibration_curve
+
+
+def test_calibration_curve_matches_per_bin_refits() -> None:
+    rng = np.random.default_rng(15)
+    n = 500
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.integers(1, 50, n),
+            "reals": rng.integers(0, 3, n),
+            "risk": rng.integers(0, 40, n) / 40,
+        }
+    )
+    horizons = pl.Series([10, 30])
+
+    result = calibration_curve(times_and_reals, "risk", horizons, n_bins=5)
+
+    cuts = [
+        times_and_reals.get_column("risk").quantile(i / 5, "lower") for i in range(1, 5)
+    ]
+    binned = times_and_reals.with_columns(
+        bin=pl.Series(np.searchsorted(cuts, times_and_reals.get_column("risk")))
+    )
+    for (bin,), subset in binned.partition_by("bin", as_dict=True).items():
+        expected = predict_aj_estimates(prepare_event_table(subset), horizons)
+        observed = result.filter(pl.col("bin") == bin)
+        assert observed.get_column("n").to_list() == [subset.height] * 2
+        np.testing.assert_allclose(
+            observed.get_column("observed").to_numpy(),
+            expected.get_column("state_occupancy_probability_1").to_numpy(),
+        )
+        np.testing.assert_allclose(
+            observed.get_column("predicted").to_numpy(),
+            subset.get_column("risk").mean(),
+        )
@@ -0,0 +1,56 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.cli import main
+
+
+def test_cli_writes_event_tables_and_predictions(tmp_path, capsys) -> None:
+    inputs = {
+        "a": pl.DataFrame(
+            {"time": [1, 2, 2, 3], "status": [1, 0, 2, 1], "site": [0, 0, 1, 1]}
+        ),
+        "b": pl.DataFrame(
+            {"time": [4, 1, 3, 3], "status": [0, 1, 1, 2], "site": [1, 0, 1, 0]}
+        ),
+    }
+    for name, frame in inputs.items():
+        frame.write_parquet(tmp_path / f"{name}.parquet")
+
+    main(
+        [
+            str(tmp_path / "*.parquet"),
+            "--times", "time",
+            "--reals", "status",
+            "--by", "site",
+            "--horizons", "2", "3",
+            "--output-dir", str(tmp_path / "out"),
+            "--workers", "2",
+            "--profile",
+        ]
+    )  # fmt: skip
+
+    for name, frame in inputs.items():
+        expected = prepare_event_table(
+            frame.rename({"time": "times", "status": "reals"}), by="site"
+        )
+        assert_frame_equal(
+            pl.read_parquet(tmp_path / "out" / f"{name}.event_table.parquet"),
+            expected,
+        )
+        assert_frame_equal(
+            pl.read_parquet(tmp_path / "out" / f"{name}.predictions.parquet"),
+            predict_aj_estimates(expected, pl.Series([2, 3]), by="site"),
+        )
+    assert "add_at_risk_column" in capsys.readouterr().err
+
+
+def test_cli_rejects_inputs_with_the_same_stem(tmp_path) -> None:
+    frame = pl.DataFrame({"times": [1, 2], "reals": [1, 0]})
+    frame.write_parquet(tmp_path / "x.parquet")
+    frame.write_csv(tmp_path / "x.csv")
+
+    with pytest.raises(SystemExit, match="same file name stem"):
+        main([str(tmp_path / "x.*"), "--output-dir", str(tmp_path / "out")])
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,175 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.compare import (
+    _chi2_sf,
+    _grays_score_and_covariance,
+    grays_test,
+    risk_differences,
+)
+
+
+def test_grays_test_without_censoring_is_close_to_subdistribution_logrank() -> None:
+    lifelines_statistics = pytest.importorskip("lifelines.statistics")
+    rng = np.random.default_rng(16)
+    n = 300
+    times_and_reals = pl.DataFrame(
+        {
+            "times": np.r_[rng.exponential(10, n), [100.0] * 3],
+            "reals": np.r_[rng.integers(1, 3, n), [1] * 3],
+            "arm": np.r_[rng.integers(0, 3, n), [0, 1, 2]],
+        }
+    )
+
+    result = grays_test(times_and_reals, "arm")
+
+    # Without censoring, competing events never leave the subdistribution
+    # risk set, so they are censored after the last observed time. Every arm
+    # is observed until the same last time, after which R_g = 0 in both.
+    times = times_and_reals.get_column("times").to_numpy()
+    is_cause = times_and_reals.get_column("reals").to_numpy() == 1
+    expected = lifelines_statistics.multivariate_logrank_test(
+        np.where(is_cause, times, times.max() + 1),
+        times_and_reals.get_column("arm").to_numpy(),
+        is_cause,
+    )
+
+    # The scores are the same; Gray's covariance differs from the
+    # hypergeometric one in finite samples.
+    assert result.item(0, "df") == 2
+    assert result.item(0, "statistic") == pytest.approx(
+        expected.test_statistic, rel=0.15
+    )
+
+
+def test_grays_test_is_calibrated_under_the_null() -> None:
+    rng = np.random.default_rng(16)
+    n, n_datasets = 150, 200
+
+    statistics = []
+    for _ in range(n_datasets):
+        cause_1 = rng.exponential(10, n)
+        cause_2 = rng.exponential(15, n)
+        censoring = rng.uniform(0, 25, n)
+        times = np.minimum.reduce([cause_1, cause_2, censoring])
+        reals = np.select([times == cause_1, times == cause_2], [1, 2], 0)
+        times_and_reals = pl.DataFrame(
+            {"times": times, "reals": reals, "arm": rng.integers(0, 3, n)}
+        )
+        statistics.append(grays_test(times_and_reals, "arm").item(0, "statistic"))
+
+    # Chi-squared with 2 degrees of freedom has mean 2 and variance 4.
+    assert np.mean(statistics) == pytest.approx(2, abs=0.35)
+    assert np.var(statistics) == pytest.approx(4, abs=1.5)
+
+
+def test_grays_covariance_matches_the_delta_method() -> None:
+    rng = np.random.default_rng(3)
+    n, n_groups = 300, 3
+    arm = rng.integers(0, n_groups, n)
+    cause_1 = rng.exponential(10, n)
+    cause_2 = rng.exponential(8, n)
+    censoring = rng.uniform(0, np.where(arm == 1, 10, 30))
+    times = np.minimum.reduce([cause_1, cause_2, censoring])
+    reals = np.select([times == cause_1, times == cause_2], [1, 2], 0)
+    event_table = prepare_event_table(
+        pl.DataFrame({"times": times, "reals": reals, "arm": arm}), by="arm"
+    )
+
+    score, covariance = _grays_score_and_covariance(event_table, "arm", 1)
+
+    # Differentiate the score numerically in the cause-specific hazard
+    # increments of every group, whose variances are d / Y ** 2.
+    pooled_times = np.unique(times)
+    in_group = (arm[:, None] == np.arange(n_groups)).astype(int)
+    at_times = times[None, :] == pooled_times[:, None]
+    at_risk = (times[None, :] >= pooled_times[:, None]) @ in_group
+    hazards = [
+        np.divide(
+            at_times @ (in_group * (reals == cause)[:, None]),
+            at_risk,
+            out=np.zeros(at_risk.shape),
+            where=at_risk > 0,
+        ).T
+        for cause in (1, 2)
+    ]
+    at_risk = at_risk.T
+
+    def subdistribution_score(hazard_1, hazard_2):
+        survival = np.cumprod(1 - hazard_1 - hazard_2, axis=1)
+        previous_survival = np.c_[np.ones(n_groups), survival[:, :-1]]
+        incidence = np.cumsum(previous_survival * hazard_1, axis=1)
+        previous_incidence = np.c_[np.zeros(n_groups), incidence[:, :-1]]
+        risk_sets = np.divide(
+            at_risk * (1 - previous_incidence),
+            previous_survival,
+            out=np.zeros(at_risk.shape),
+            where=previous_survival > 0,
+        )
+        events = hazard_1 * at_risk
+        expected = np.divide(
+            risk_sets * events.sum(axis=0),
+            risk_sets.sum(axis=0),
+            out=np.zeros(at_risk.shape),
+            where=risk_sets.sum(axis=0) > 0,
+        )
+        return (events - expected).sum(axis=1)
+
+    expected_score = subdistribution_score(*hazards)
+    expected_covariance = np.zeros((n_groups, n_groups))
+    step = 1e-7
+    for which, hazard in enumerate(hazards):
+        for g, t in zip(*np.nonzero(hazard)):
+            shifted = [h.copy() for h in hazards]
+            shifted[which][g, t] += step
+            gradient = (subdistribution_score(*shifted) - expected_score) / step
+            expected_covariance += np.outer(gradient, gradient) * (
+                hazard[g, t] / at_risk[g, t]
+            )
+
+    np.testing.assert_allclose(score, expected_score, atol=1e-9)
+    # The delta method also keeps the second-order terms that Gray's
+    # covariance drops; the log-rank covariance is off by 15% here.
+    np.testing.assert_allclose(
+        covariance, expected_covariance, atol=0.03 * np.abs(expected_covariance).max()
+    )
+
+
+def test_chi2_sf() -> None:
+    assert _chi2_sf(3.841458820694124, 1) == pytest.approx(0.05)
+    assert _chi2_sf(5.991464547107979, 2) == pytest.approx(0.05)
+    assert _chi2_sf(7.814727903251178, 3) == pytest.approx(0.05)
+
+
+def test_risk_differences() -> None:
+    rng = np.random.default_rng(16)
+    n = 200
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.integers(1, 30, n),
+            "reals": rng.integers(0, 3, n),
+            "arm": rng.integers(0, 2, n),
+        }
+    )
+    horizons = pl.Series([5, 20])
+
+    result = risk_differences(times_and_reals, "arm", horizons)
+
+    estimates = predict_aj_estimates(
+        prepare_event_table(times_and_reals, by="arm", variance=True),
+        horizons,
+        by="arm",
+    )
+    control, treated = estimates.partition_by("arm")
+    np.testing.assert_allclose(
+        result.get_column("difference").to_numpy(),
+        treated.get_column("state_occupancy_probability_1").to_numpy()
+        - control.get_column("state_occupancy_probability_1").to_numpy(),
+    )
+    np.testing.assert_allclose(
+        result.get_column("variance").to_numpy(),
+        treated.get_column("state_occupancy_probability_1_variance").to_numpy()
+        + control.get_column("state_occupancy_probability_1_variance").to_numpy(),
+    )
@@ -0,0 +1,51 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from polarstate import EventCounts, prepare_event_table
+
+
+def test_event_counts_merge_and_finalize() -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "site": ["a", "a", "b", "a", "b", "a", "b", "a"],
+            "times": [1, 1, 2, 2, 2, 3, 3, 3],
+            "reals": [0, 1, 0, 1, 2, 2, 2, 1],
+        }
+    )
+
+    batches = [
+        EventCounts.from_times_and_reals(batch, by="site")
+        for batch in times_and_reals.iter_slices(3)
+    ]
+
+    merged = batches[2].merge(batches[0]) + batches[1]
+
+    assert_frame_equal(
+        merged.finalize(), prepare_event_table(times_and_reals, by="site")
+    )
+
+
+def test_event_counts_merge_orders_causes() -> None:
+    first = pl.DataFrame({"times": [1, 2], "reals": [3, 0]})
+    second = pl.DataFrame({"times": [2, 3], "reals": [1, 1]})
+
+    merged = EventCounts.from_times_and_reals(first, causes="infer").merge(
+        EventCounts.from_times_and_reals(second, causes="infer")
+    )
+
+    assert_frame_equal(
+        merged.finalize(),
+        prepare_event_table(pl.concat([first, second]), causes="infer"),
+    )
+
+
+def test_event_counts_equality() -> None:
+    times_and_reals = pl.DataFrame(
+        {"site": ["a", "b", "a"], "times": [1, 2, 3], "reals": [1, 0, 2]}
+    )
+    counts = EventCounts.from_times_and_reals(times_and_reals, by="site")
+
+    assert counts == EventCounts.from_times_and_reals(times_and_reals, by="site")
+    assert counts != EventCounts.from_times_and_reals(times_and_reals.head(2), "site")
+    assert counts != EventCounts(counts.counts)
+    assert counts != "counts"
@@ -0,0 +1,45 @@
+import numpy as np
+import polars as pl
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.decision import net_benefit
+
+
+def test_net_benefit_matches_refits_per_threshold() -> None:
+    rng = np.random.default_rng(14)
+    n = 120
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.integers(1, 30, n),
+            "reals": rng.integers(0, 3, n),
+            "risk": rng.random(n),
+        }
+    )
+    horizons = pl.Series([5, 15])
+    thresholds = pl.Series([0.0, 0.1, 0.35, 0.5, 0.8, 0.99])
+
+    result = net_benefit(times_and_reals, "risk", horizons, thresholds)
+
+    expected = []
+    for horizon in horizons:
+        for threshold in thresholds:
+            treated = times_and_reals.filter(pl.col("risk") >= threshold)
+            incidence = (
+                predict_aj_estimates(
+                    prepare_event_table(treated), pl.Series([horizon])
+                ).item(0, "state_occupancy_probability_1")
+                if treated.height
+                else 0.0
+            )
+            share = treated.height / n
+            expected.append(
+                share * incidence
+                - share * (1 - incidence) * threshold / (1 - threshold)
+            )
+
+    assert result.get_column("times").to_list() == [5] * 6 + [15] * 6
+    np.testing.assert_allclose(result.get_column("net_benefit").to_numpy(), expected)
+    np.testing.assert_allclose(
+        result.filter(pl.col("threshold") == 0).get_column("net_benefit_treat_all"),
+        result.filter(pl.col("threshold") == 0).get_column("net_benefit"),
+    )
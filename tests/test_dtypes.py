@@ -0,0 +1,86 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polarstate import EventTableDtypes, predict_aj_estimates, prepare_event_table
+
+TIMES_AND_REALS = pl.DataFrame(
+    {
+        "times": [1, 2, 2, 3, 4, 4, 5, 6, 6, 7],
+        "reals": [1, 0, 2, 1, 0, 2, 1, 0, 1, 2],
+        "group": ["a", "b", "a", "b", "a", "b", "a", "b", "a", "b"],
+    }
+)
+
+
+def test_compact_event_table_predicts_like_full_table() -> None:
+    horizons = pl.Series("times", [0, 2, 5, 10])
+    full = prepare_event_table(TIMES_AND_REALS, by="group", variance=True)
+    compact = prepare_event_table(
+        TIMES_AND_REALS, by="group", variance=True, compact=True
+    )
+
+    assert compact.columns == [
+        "group",
+        "times",
+        "overall_survival",
+        "overall_survival_variance",
+        "state_occupancy_probability_1_at_times",
+        "state_occupancy_probability_2_at_times",
+        "state_occupancy_probability_1_at_times_variance",
+        "state_occupancy_probability_2_at_times_variance",
+    ]
+    assert_frame_equal(
+        predict_aj_estimates(compact, horizons, by="group"),
+        predict_aj_estimates(full, horizons, by="group"),
+    )
+    with pytest.raises(ValueError, match="compact"):
+        predict_aj_estimates(
+            prepare_event_table(TIMES_AND_REALS, compact=True),
+            horizons,
+            n_bootstrap=10,
+        )
+
+
+def test_event_table_dtypes() -> None:
+    dtypes = EventTableDtypes(
+        probabilities=pl.Float32, counts=pl.UInt32, times=pl.Int32
+    )
+    full = prepare_event_table(TIMES_AND_REALS, by="group")
+    narrow = prepare_event_table(TIMES_AND_REALS.lazy(), by="group", dtypes=dtypes)
+
+    schema = narrow.collect_schema()
+    assert schema["group"] == pl.String
+    assert schema["times"] == pl.Int32
+    assert schema["count_1"] == schema["at_risk"] == pl.UInt32
+    assert schema["overall_survival"] == pl.Float32
+    np.testing.assert_allclose(
+        narrow.collect().select(pl.selectors.float()).to_numpy(),
+        full.select(pl.selectors.float()).to_numpy(),
+        rtol=1e-6,
+    )
+
+
+def test_event_table_dtypes_are_validated() -> None:
+    with pytest.raises(ValueError, match="float"):
+        EventTableDtypes(probabilities=pl.Int32)
+    with pytest.raises(ValueError, match="integer"):
+        EventTableDtypes(counts=pl.Float32)
+
+    with pytest.raises(ValueError, match="times"):
+        prepare_event_table(
+            TIMES_AND_REALS.with_columns(pl.col("times") * 2**40),
+            dtypes=EventTableDtypes(times=pl.Int32),
+        )
+    with pytest.raises(ValueError, match="times"):
+        prepare_event_table(
+            TIMES_AND_REALS.with_columns(pl.col("times") + 0.1),
+            dtypes=EventTableDtypes(times=pl.Float32),
+        )
+    with pytest.raises(ValueError, match="count_"):
+        prepare_event_table(
+            TIMES_AND_REALS.with_columns(weights=pl.lit(0.5)),
+            weights="weights",
+            dtypes=EventTableDtypes(counts=pl.UInt32),
+        )
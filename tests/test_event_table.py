@@ -0,0 +1,36 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polarstate import EventTable, predict_aj_estimates, prepare_event_table
+
+
+def test_event_table_predict() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [1, 1, 2, 2, 2, 3, 3], "reals": [0, 1, 0, 1, 2, 2, 2]}
+    )
+    fixed_time_horizons = pl.Series([5, 0, 1, 2])
+
+    result = EventTable.fit(times_and_reals).predict(fixed_time_horizons)
+
+    expected_output = predict_aj_estimates(
+        prepare_event_table(times_and_reals), fixed_time_horizons
+    )
+
+    assert_frame_equal(result, expected_output)
+
+
+def test_event_table_rejects_stratified_tables() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [1, 2, 1, 2], "reals": [1, 0, 2, 1], "site": ["a", "a", "b", "b"]}
+    )
+
+    with pytest.raises(ValueError, match="unstratified"):
+        EventTable(prepare_event_table(times_and_reals, by="site"))
+
+    # Strata without a shared time are caught by their stratum column.
+    disjoint = times_and_reals.with_columns(
+        pl.when(pl.col("site") == "b").then(pl.col("times") + 2).otherwise("times")
+    )
+    with pytest.raises(ValueError, match=r"\['site'\]"):
+        EventTable(prepare_event_table(disjoint, by="site"))
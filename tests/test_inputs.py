@@ -0,0 +1,111 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polarstate import EventCounts, as_times_and_reals, prepare_event_table
+from polarstate.aj import group_reals_by_times
+
+rng = np.random.default_rng(5)
+TIMES = rng.integers(1, 200, 1000)
+REALS = rng.integers(0, 4, 1000)
+
+
+def test_as_times_and_reals_wraps_numpy_without_copying() -> None:
+    frame = as_times_and_reals({"time": TIMES, "status": REALS}, "time", "status")
+
+    assert frame.columns == ["times", "reals"]
+    assert np.shares_memory(frame.get_column("times").to_numpy(), TIMES)
+
+
+@pytest.mark.parametrize("kind", ["pandas", "arrow", "structured"])
+def test_prepare_event_table_accepts_frame_like_inputs(kind) -> None:
+    expected = prepare_event_table(pl.DataFrame({"times": TIMES, "reals": REALS}))
+
+    if kind == "pandas":
+        pd = pytest.importorskip("pandas")
+        data = pd.DataFrame({"time": TIMES, "status": REALS})
+    elif kind == "arrow":
+        pa = pytest.importorskip("pyarrow")
+        data = pa.table({"time": TIMES, "status": REALS})
+    else:
+        data = np.rec.fromarrays([TIMES, REALS], names="time,status")
+
+    assert_frame_equal(
+        prepare_event_table(data, times="time", reals="status"), expected
+    )
+
+
+def test_as_times_and_reals_rejects_unknown_inputs() -> None:
+    with pytest.raises(TypeError, match="list"):
+        as_times_and_reals([TIMES, REALS])
+
+
+@pytest.mark.parametrize(
+    ("by", "weights", "causes"),
+    [
+        (None, None, None),
+        ("group", "weights", None),
+        ("group", None, "infer"),
+        (None, None, [3, 1]),
+    ],
+)
+def test_group_reals_by_times_sorted_run_length(by, weights, causes) -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": TIMES,
+            "reals": REALS,
+            "group": rng.integers(0, 3, len(TIMES)),
+            "weights": rng.random(len(TIMES)),
+        }
+    ).sort([*([by] if by else []), "times"])
+
+    expected = group_reals_by_times(times_and_reals.lazy(), by, weights, causes)
+    assert_frame_equal(
+        group_reals_by_times(times_and_reals, by, weights, causes, assume_sorted=True),
+        expected.collect(),
+    )
+    assert_frame_equal(
+        EventCounts.from_times_and_reals(
+            times_and_reals, by, weights, causes, assume_sorted=True
+        ).finalize(),
+        prepare_event_table(
+            times_and_reals.sample(fraction=1.0, shuffle=True, seed=1),
+            by=by,
+            weights=weights,
+            causes=causes,
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "reals",
+    [
+        pl.Series("reals", [0.0, 1.0, 2.0, 1.0]),
+        pl.Series("reals", [0, None, 2, 1]),
+    ],
+)
+def test_sorted_input_with_float_or_null_reals(reals) -> None:
+    times_and_reals = pl.DataFrame({"times": [1, 2, 3, 4], "reals": reals})
+
+    assert_frame_equal(
+        prepare_event_table(times_and_reals),
+        prepare_event_table(times_and_reals.lazy()).collect(),
+    )
+
+
+def test_sorted_input_with_null_strata() -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": [1, 1, 2, 1, 3],
+            "reals": [1, 0, 2, 1, 0],
+            "site": [None, None, None, "a", "a"],
+        }
+    )
+
+    counts = group_reals_by_times(times_and_reals, "site", assume_sorted=True)
+
+    assert counts.height == 4
+    assert_frame_equal(
+        counts, group_reals_by_times(times_and_reals.lazy(), "site").collect()
+    )
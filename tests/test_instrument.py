@@ -0,0 +1,68 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from polarstate import StageRecorder, predict_aj_estimates, prepare_event_table
+from polarstate.instrument import run_stage
+
+
+def test_stage_recorder() -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": [1, 2, 2, 3, 4, 4, 5, 6],
+            "reals": [1, 0, 2, 1, 0, 2, 1, 0],
+            "group": ["a", "b", "a", "b", "a", "b", "a", "b"],
+        }
+    )
+    horizons = pl.Series("times", [2, 5])
+
+    event_table = prepare_event_table(times_and_reals.lazy(), by="group")
+    predictions = predict_aj_estimates(event_table.collect(), horizons, by="group")
+
+    with StageRecorder(explain=True) as recorder:
+        recorded_event_table = prepare_event_table(times_and_reals.lazy(), by="group")
+        recorded_predictions = predict_aj_estimates(
+            recorded_event_table.collect(), horizons, by="group"
+        )
+
+    assert_frame_equal(recorded_event_table.collect(), event_table.collect())
+    assert_frame_equal(recorded_predictions, predictions)
+
+    profile = recorder.to_frame()
+    stages = profile.get_column("stage").to_list()
+    assert stages[0] == "group_reals_by_times"
+    assert "add_at_risk_column" in stages
+    assert stages[-2:] == ["sort_event_table", "join_asof"]
+    assert profile.filter(pl.col("stage") == "group_reals_by_times").item(
+        0, "input_rows"
+    ) == len(times_and_reals)
+    assert (
+        profile.filter(pl.col("stage").str.starts_with("add_"))
+        .get_column("plan")
+        .is_not_null()
+        .all()
+    )
+    assert profile.get_column("seconds").min() >= 0
+
+
+def test_stage_recorder_inactive_outside_context() -> None:
+    times_and_reals = pl.DataFrame({"times": [1, 2, 3], "reals": [1, 0, 2]})
+
+    with StageRecorder() as recorder:
+        pass
+    prepare_event_table(times_and_reals)
+
+    assert recorder.to_frame().is_empty()
+
+
+def test_stage_recorder_explains_without_rerunning_the_stage() -> None:
+    calls = []
+
+    def stage(frame: pl.LazyFrame) -> pl.LazyFrame:
+        calls.append(frame)
+        return frame.with_columns(doubled=pl.col("times") * 2)
+
+    with StageRecorder(explain=True) as recorder:
+        run_stage(pl.LazyFrame({"times": [1, 2, 3]}), stage).collect()
+
+    assert len(calls) == 1
+    assert "doubled" in recorder.to_frame().item(0, "plan")
@@ -0,0 +1,57 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polarstate import load_event_table, prepare_event_table, save_event_table
+from polarstate.io import input_sha256, read_event_table_metadata
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("suffix", [".arrow", ".parquet"])
+def test_save_and_load_event_table(tmp_path, suffix) -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": [1, 2, 2, 3, 4, 4],
+            "reals": [1, 0, 2, 1, 0, 2],
+            "group": ["a", "b", "a", "b", "a", "b"],
+        }
+    )
+    event_table = prepare_event_table(times_and_reals, by="group")
+    path = tmp_path / f"event_table{suffix}"
+
+    save_event_table(event_table, path, times_and_reals, by="group")
+
+    assert_frame_equal(
+        load_event_table(path, times_and_reals=times_and_reals), event_table
+    )
+    assert read_event_table_metadata(path) == {
+        "schema_version": 1,
+        "by": ["group"],
+        "input_rows": 6,
+        "input_sha256": input_sha256(times_and_reals),
+    }
+    with pytest.raises(ValueError, match="not built from"):
+        load_event_table(path, times_and_reals=times_and_reals.reverse())
+
+
+def test_input_sha256_does_not_depend_on_the_slice_size(monkeypatch) -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": [1.5, None, 2.0, 3.0, 4.0],
+            "reals": [1, 0, 2, 1, 0],
+            "group": ["a", None, "bb", "", "a"],
+            "date": pl.Series([1, 2, None, 4, 5]).cast(pl.Date),
+            "flag": [True, None, False, True, False],
+        }
+    )
+    expected = input_sha256(times_and_reals)
+
+    monkeypatch.setattr("polarstate.io._HASH_SLICE_ROWS", 2)
+
+    assert input_sha256(times_and_reals) == expected
+    assert input_sha256(times_and_reals.reverse()) != expected
+    assert (
+        input_sha256(times_and_reals.with_columns(pl.col("group").fill_null("")))
+        != expected
+    )
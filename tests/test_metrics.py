@@ -0,0 +1,59 @@
+import numpy as np
+import polars as pl
+
+from polarstate.metrics import brier_score, time_dependent_auc
+
+
+def _censoring_km(times, reals, t, left_limit=False):
+    survival = 1.0
+    for s in np.unique(times):
+        if s > t or (left_limit and s == t):
+            break
+        at_risk = (times >= s).sum()
+        survival *= 1 - ((times == s) & (reals == 0)).sum() / at_risk
+    return survival
+
+
+def test_metrics_match_pairwise_definitions() -> None:
+    rng = np.random.default_rng(13)
+    n = 80
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.integers(1, 20, n),
+            "reals": rng.integers(0, 3, n),
+            "risk": rng.integers(0, 10, n) / 10,
+        }
+    )
+    horizons = pl.Series([3, 8, 12, 16])
+
+    auc = time_dependent_auc(times_and_reals, "risk", horizons)
+    brier = brier_score(times_and_reals, "risk", horizons)
+
+    times = times_and_reals.get_column("times").to_numpy()
+    reals = times_and_reals.get_column("reals").to_numpy()
+    risk = times_and_reals.get_column("risk").to_numpy()
+    expected_auc, expected_brier = [], []
+    for h in horizons:
+        weights = np.array(
+            [
+                0.0
+                if t <= h and r == 0
+                else 1 / _censoring_km(times, reals, t, left_limit=True)
+                if t <= h
+                else 1 / _censoring_km(times, reals, h)
+                for t, r in zip(times, reals)
+            ]
+        )
+        case = (times <= h) & (reals == 1)
+        control = (times > h) | ((times <= h) & (reals == 2))
+        concordance = (risk[:, None] > risk[None, :]) + 0.5 * (
+            risk[:, None] == risk[None, :]
+        )
+        pair_weights = np.outer(weights * case, weights * control)
+        expected_auc.append((pair_weights * concordance).sum() / pair_weights.sum())
+        expected_brier.append((weights * (case - risk) ** 2).mean())
+
+    np.testing.assert_allclose(auc.get_column("auc").to_numpy(), expected_auc)
+    np.testing.assert_allclose(
+        brier.get_column("brier_score").to_numpy(), expected_brier
+    )
@@ -0,0 +1,131 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.multistate import _prefix_products, prepare_multistate_table
+
+
+def test_prepare_multistate_table_reduces_to_competing_risks() -> None:
+    rng = np.random.default_rng(18)
+    n = 150
+    times_and_reals = pl.DataFrame(
+        {"times": rng.integers(1, 25, n), "reals": rng.integers(0, 3, n)}
+    )
+    transitions = times_and_reals.with_row_index("id").select(
+        "id",
+        pl.lit(0).alias("from_state"),
+        pl.when(pl.col("reals") != 0).then(pl.col("reals")).alias("to_state"),
+        "times",
+    )
+
+    result = prepare_multistate_table(transitions)
+
+    expected = prepare_event_table(times_and_reals).filter(
+        pl.col("count_1") + pl.col("count_2") > 0
+    )
+    for state in (1, 2):
+        column = f"state_occupancy_probability_{state}_at_times"
+        np.testing.assert_allclose(
+            result.get_column(column), expected.get_column(column)
+        )
+    assert (
+        result.get_column("at_risk_0").to_list()
+        == expected.get_column("at_risk").to_list()
+    )
+
+    horizons = pl.Series([3, 12, 30])
+    np.testing.assert_allclose(
+        predict_aj_estimates(result, horizons).drop("estimate_origin").to_numpy(),
+        predict_aj_estimates(prepare_event_table(times_and_reals), horizons)
+        .drop("estimate_origin")
+        .to_numpy(),
+    )
+
+
+def test_prepare_multistate_table_illness_death() -> None:
+    transitions = pl.DataFrame(
+        {
+            "id": [1, 1, 2, 3, 3, 4, 5, 6, 6],
+            "from_state": [0, 1, 0, 0, 1, 0, 0, 0, 1],
+            "to_state": [1, 2, 2, 1, None, None, 1, 1, 2],
+            "times": [1, 4, 2, 2, 5, 3, 3, 1, 2],
+        }
+    )
+
+    result = prepare_multistate_table(transitions)
+
+    # Sequential product integral over the transition times 1, 2, 3, 4.
+    occupancy = np.array([1.0, 0.0, 0.0])
+    expected = []
+    for counts, at_risk in (
+        ({(0, 1): 2}, [6, 0, 0]),
+        ({(0, 1): 1, (0, 2): 1, (1, 2): 1}, [4, 2, 0]),
+        ({(0, 1): 1}, [2, 2, 0]),
+        ({(1, 2): 1}, [0, 2, 0]),
+    ):
+        transition = np.eye(3)
+        for (a, b), count in counts.items():
+            transition[a, b] += count / at_risk[a]
+            transition[a, a] -= count / at_risk[a]
+        occupancy = occupancy @ transition
+        expected.append(occupancy)
+
+    assert result.get_column("times").to_list() == [1, 2, 3, 4]
+    assert result.get_column("at_risk_1").to_list() == [0, 2, 2, 2]
+    np.testing.assert_allclose(
+        result.select(
+            "state_occupancy_probability_1_at_times",
+            "state_occupancy_probability_2_at_times",
+        ).to_numpy(),
+        np.array(expected)[:, 1:],
+    )
+
+
+def test_prepare_multistate_table_state_labels() -> None:
+    transitions = pl.DataFrame(
+        {
+            "patient": [1, 1, 2, 3],
+            "from_state": [0, 3, 0, 0],
+            "to_state": [3, 5, 5, None],
+            "times": [1, 2, 3, 4],
+        }
+    )
+
+    result = prepare_multistate_table(transitions, subject="patient")
+
+    assert result.columns == [
+        "times",
+        "at_risk_0",
+        "at_risk_3",
+        "at_risk_5",
+        "state_occupancy_probability_3_at_times",
+        "state_occupancy_probability_5_at_times",
+    ]
+    relabelled = prepare_multistate_table(
+        transitions.with_columns(
+            pl.col("from_state", "to_state").replace({3: 1, 5: 2})
+        ),
+        subject="patient",
+    )
+    np.testing.assert_allclose(
+        result.select(pl.col("^state_occupancy.*$")).to_numpy(),
+        relabelled.select(pl.col("^state_occupancy.*$")).to_numpy(),
+    )
+    with pytest.raises(ValueError, match=r"\[1, 3, 5\]"):
+        prepare_multistate_table(
+            transitions.with_columns(pl.col("from_state").replace(0, 1)),
+            subject="patient",
+        )
+
+
+def test_prefix_products() -> None:
+    rng = np.random.default_rng(18)
+    matrices = rng.dirichlet(np.ones(4), (3000, 4))
+
+    result = _prefix_products(matrices)
+
+    expected = np.eye(4)
+    for matrix, product in zip(matrices, result):
+        expected = expected @ matrix
+        np.testing.assert_allclose(product, expected)
@@ -0,0 +1,82 @@
+import numpy as np
+import polars as pl
+
+import polarstate  # noqa: F401
+from polarstate import predict_aj_estimates, prepare_event_table
+
+
+def test_expr_namespace_matches_event_table_per_group() -> None:
+    rng = np.random.default_rng(19)
+    n = 300
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.integers(1, 30, n),
+            "reals": rng.integers(0, 3, n),
+            "site": rng.integers(0, 3, n),
+        }
+    )
+    horizons = [0, 5, 12, 40]
+
+    result = (
+        times_and_reals.lazy()
+        .group_by("site")
+        .agg(
+            pl.col("times").aj.cif("reals", horizons).alias("cif_1"),
+            pl.col("times").aj.cif("reals", horizons, cause=2).alias("cif_2"),
+            pl.col("times").aj.survival("reals", horizons).alias("survival"),
+            pl.col("times").aj.cif("reals", 12).alias("cif_1_at_12"),
+        )
+        .sort("site")
+        .collect()
+    )
+
+    expected = predict_aj_estimates(
+        times_and_reals.aj.event_table(by="site"), pl.Series(horizons), by="site"
+    )
+    for column, state in (("survival", 0), ("cif_1", 1), ("cif_2", 2)):
+        np.testing.assert_allclose(
+            result.get_column(column).explode().to_numpy(),
+            expected.get_column(f"state_occupancy_probability_{state}").to_numpy(),
+            atol=1e-12,
+        )
+    np.testing.assert_allclose(
+        result.get_column("cif_1_at_12").to_numpy(),
+        expected.filter(pl.col("times") == 12)
+        .get_column("state_occupancy_probability_1")
+        .to_numpy(),
+    )
+
+
+def test_expr_namespace_accepts_array_horizons() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [1, 2, 2, 3, 5, 8], "reals": [1, 0, 2, 1, 0, 2]}
+    )
+    horizons = [0, 2, 4, 10]
+
+    result = times_and_reals.select(
+        list=pl.col("times").aj.cif("reals", horizons),
+        numpy=pl.col("times").aj.cif("reals", np.array(horizons)),
+        tuple=pl.col("times").aj.cif("reals", tuple(horizons)),
+        scalar=pl.col("times").aj.cif("reals", np.float64(4)),
+    )
+
+    assert result.height == len(horizons)
+    assert result.get_column("numpy").to_list() == result.get_column("list").to_list()
+    assert result.get_column("tuple").to_list() == result.get_column("list").to_list()
+    assert result.get_column("scalar").to_list() == [result.item(2, "list")] * 4
+
+
+def test_frame_namespaces() -> None:
+    times_and_reals = pl.DataFrame({"times": [1, 2, 2, 3], "reals": [1, 0, 2, 1]})
+
+    plan = times_and_reals.lazy().aj.event_table()
+
+    assert isinstance(plan, pl.LazyFrame)
+    assert plan.collect().equals(prepare_event_table(times_and_reals))
+    assert (
+        times_and_reals.aj.event_table()
+        .aj.predict(pl.Series([2]))
+        .equals(
+            predict_aj_estimates(prepare_event_table(times_and_reals), pl.Series([2]))
+        )
+    )
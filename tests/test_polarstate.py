@@ -1,4 +1,6 @@
+import numpy as np
 import polars as pl
+import pytest
 from polarstate.aj import (
     create_sorted_times_and_reals_data,
     group_reals_by_times,
@@ -9,6 +11,7 @@ from polarstate.aj import (
     add_previous_overal_survival_column,
     add_transition_probabilities_at_times_columns,
     add_state_occupancy_probabilities_at_times_columns,
+    coarsen_times,
     prepare_event_table,
 )
 from polarstate.predict import predict_aj_estimates
@@ -426,3 +429,299 @@ def test_predict_aj_estimates() -> None:
     )
 
     assert_frame_equal(result, expected_output)
+
+
+def test_prepare_event_table_lazy() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [1, 1, 2, 2, 2, 3, 3], "reals": [0, 1, 0, 1, 2, 2, 2]}
+    )
+
+    result = prepare_event_table(times_and_reals.lazy())
+
+    assert isinstance(result, pl.LazyFrame)
+    assert_frame_equal(result.collect(), prepare_event_table(times_and_reals))
+
+
+def test_prepare_event_table_by() -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "site": ["a"] * 7 + ["b"] * 5,
+            "times": [1, 1, 2, 2, 2, 3, 3, 2, 4, 4, 5, 6],
+            "reals": [0, 1, 0, 1, 2, 2, 2, 1, 0, 2, 1, 0],
+        }
+    )
+
+    result = prepare_event_table(times_and_reals, by="site")
+
+    expected_output = pl.concat(
+        [
+            prepare_event_table(stratum).select(pl.lit(site).alias("site"), pl.all())
+            for (site,), stratum in times_and_reals.partition_by(
+                "site", as_dict=True, maintain_order=True
+            ).items()
+        ]
+    )
+
+    assert_frame_equal(result, expected_output)
+
+
+def test_predict_aj_estimates_by() -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "site": ["a"] * 7 + ["b"] * 5,
+            "times": [1, 1, 2, 2, 2, 3, 3, 2, 4, 4, 5, 6],
+            "reals": [0, 1, 0, 1, 2, 2, 2, 1, 0, 2, 1, 0],
+        }
+    )
+    fixed_time_horizons = pl.Series([1, 3, 5])
+
+    result = predict_aj_estimates(
+        prepare_event_table(times_and_reals, by="site"),
+        fixed_time_horizons,
+        by="site",
+    )
+
+    expected_output = pl.concat(
+        [
+            predict_aj_estimates(
+                prepare_event_table(stratum), fixed_time_horizons
+            ).select(pl.lit(site).alias("site"), pl.all())
+            for (site,), stratum in times_and_reals.partition_by(
+                "site", as_dict=True, maintain_order=True
+            ).items()
+        ]
+    )
+
+    assert_frame_equal(result, expected_output)
+
+
+def test_prepare_event_table_variance_matches_lifelines() -> None:
+    pd = pytest.importorskip("pandas")
+    lifelines = pytest.importorskip("lifelines")
+
+    times = [24.1, 9.7, 49.9, 18.6, 34.8, 14.2, 39.2, 46.0, 31.5, 4.3]
+    reals = [1, 1, 1, 1, 0, 2, 1, 2, 0, 1]
+
+    result = prepare_event_table(
+        pl.DataFrame({"times": times, "reals": reals}), variance=True
+    )
+
+    for cause in (1, 2):
+        fitter = lifelines.AalenJohansenFitter().fit(
+            pd.Series(times), pd.Series(reals), event_of_interest=cause
+        )
+        # lifelines reports NaN once nobody remains at risk.
+        expected_output = fitter.variance_.to_numpy()[1:-1]
+
+        np.testing.assert_allclose(
+            result[f"state_occupancy_probability_{cause}_at_times_variance"][:-1],
+            expected_output,
+        )
+
+
+def test_predict_aj_estimates_log_log_interval() -> None:
+    times_and_reals = pl.DataFrame(
+        {"times": [1, 1, 2, 2, 2, 3, 3], "reals": [0, 1, 0, 1, 2, 2, 2]}
+    )
+
+    result = predict_aj_estimates(
+        prepare_event_table(times_and_reals, variance=True), pl.Series([0, 1, 2])
+    )
+
+    # Greenwood at time 1: (6/7)^2 * 1 / (7 * 6).
+    assert result["state_occupancy_probability_0_variance"].to_list()[:2] == [
+        0.0,
+        pytest.approx((6 / 7) ** 2 / 42),
+    ]
+    for state in (0, 1, 2):
+        estimate = result[f"state_occupancy_probability_{state}"]
+        assert (result[f"state_occupancy_probability_{state}_lower"] <= estimate).all()
+        assert (result[f"state_occupancy_probability_{state}_upper"] >= estimate).all()
+
+
+def test_prepare_event_table_weights() -> None:
+    aggregated = pl.DataFrame(
+        {
+            "times": [1, 1, 2, 2, 2, 3],
+            "reals": [0, 1, 0, 1, 2, 2],
+            "n": [1, 1, 1, 1, 1, 2],
+        }
+    )
+    expanded = pl.DataFrame(
+        {"times": [1, 1, 2, 2, 2, 3, 3], "reals": [0, 1, 0, 1, 2, 2, 2]}
+    )
+
+    result = prepare_event_table(aggregated, weights="n", variance=True)
+
+    expected_output = prepare_event_table(expanded, variance=True)
+
+    assert_frame_equal(result, expected_output, check_dtypes=False)
+    assert result.schema["count_1"] == pl.Float64
+
+
+def test_prepare_event_table_many_causes() -> None:
+    rng = np.random.default_rng(0)
+    times_and_reals = pl.DataFrame(
+        {"times": rng.integers(1, 20, 300), "reals": rng.integers(0, 6, 300)}
+    )
+    fixed_time_horizons = pl.Series([3, 10, 25])
+
+    event_table = prepare_event_table(times_and_reals, causes="infer")
+    result = predict_aj_estimates(event_table, fixed_time_horizons)
+
+    assert event_table.columns[:7] == ["times", *(f"count_{k}" for k in range(6))]
+    for cause in range(1, 6):
+        # Cause k against all other causes collapsed into cause 2.
+        cause_vs_rest = times_and_reals.with_columns(
+            pl.when(pl.col("reals") == cause)
+            .then(1)
+            .when(pl.col("reals") != 0)
+            .then(2)
+            .otherwise(0)
+            .alias("reals")
+        )
+        expected_output = predict_aj_estimates(
+            prepare_event_table(cause_vs_rest), fixed_time_horizons
+        )
+
+        np.testing.assert_allclose(
+            result[f"state_occupancy_probability_{cause}"],
+            expected_output["state_occupancy_probability_1"],
+        )
+    np.testing.assert_allclose(
+        result["state_occupancy_probability_0"],
+        expected_output["state_occupancy_probability_0"],
+    )
+
+
+def test_group_reals_by_times_enum_causes() -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": [1, 1, 2, 2, 2, 3, 3],
+            "reals": ["alive", "cancer", "alive", "cancer", "cvd", "cvd", "other"],
+        }
+    )
+
+    result = group_reals_by_times(
+        times_and_reals, causes=pl.Enum(["alive", "cancer", "cvd", "other"])
+    )
+
+    expected_output = pl.DataFrame(
+        {
+            "times": [1, 2, 3],
+            "count_0": [1, 1, 0],
+            "count_1": [1, 1, 0],
+            "count_2": [0, 1, 1],
+            "count_3": [0, 0, 1],
+        }
+    )
+
+    assert_frame_equal(result, expected_output)
+
+
+def test_prepare_event_table_entry_times() -> None:
+    rng = np.random.default_rng(11)
+    n = 300
+    entry = rng.integers(0, 20, n)
+    times_and_reals = pl.DataFrame(
+        {
+            "times": entry + rng.integers(1, 40, n),
+            "reals": rng.integers(0, 3, n),
+            "entry": entry,
+            "group": rng.integers(0, 2, n),
+        }
+    )
+
+    result = prepare_event_table(times_and_reals, by="group", entry_times="entry")
+
+    # Brute force: at risk at t means entered before t and not exited before t.
+    entry_np = times_and_reals.get_column("entry").to_numpy()
+    times_np = times_and_reals.get_column("times").to_numpy()
+    group_np = times_and_reals.get_column("group").to_numpy()
+    expected_at_risk = [
+        int(((group_np == g) & (entry_np < t) & (times_np >= t)).sum())
+        for g, t in result.select("group", "times").iter_rows()
+    ]
+    assert result.get_column("at_risk").to_list() == expected_at_risk
+
+    lifelines = pytest.importorskip("lifelines")
+    unstratified = prepare_event_table(times_and_reals, entry_times="entry")
+    fitter = lifelines.KaplanMeierFitter().fit(
+        times_np, times_and_reals.get_column("reals").to_numpy() > 0, entry=entry_np
+    )
+    expected = fitter.survival_function_at_times(
+        unstratified.get_column("times").to_numpy()
+    ).to_numpy()
+    np.testing.assert_allclose(
+        unstratified.get_column("overall_survival").to_numpy(), expected
+    )
+
+
+def test_prepare_event_table_time_grid() -> None:
+    rng = np.random.default_rng(12)
+    n = 2000
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.exponential(50, n),
+            "reals": rng.integers(0, 3, n),
+            "group": rng.integers(0, 2, n),
+        }
+    )
+    grid = [5.0, 10.0, 20.0, 40.0, 80.0]
+    horizons = pl.Series("times", grid)
+
+    exact = predict_aj_estimates(
+        prepare_event_table(times_and_reals, by="group"), horizons, by="group"
+    )
+    coarse_table = prepare_event_table(times_and_reals, by="group", time_grid=grid)
+    coarse = predict_aj_estimates(coarse_table, horizons, by="group")
+
+    assert coarse_table.height == 2 * (len(grid) + 1)
+    assert (
+        coarse_table.get_column("times").max()
+        == times_and_reals.get_column("times").max()
+    )
+    states = [f"state_occupancy_probability_{state}" for state in range(3)]
+    error = (exact.select(states) - coarse.select(states)).to_numpy()
+    bound = coarse.get_column("coarsening_error_bound").to_numpy()
+    assert (np.abs(error) <= bound[:, None]).all()
+    assert (bound > 0).all()
+
+    off_grid = predict_aj_estimates(
+        coarse_table, pl.Series("times", [3.0, 7.0, 15.0]), by="group"
+    )
+    assert off_grid.get_column("coarsening_error_bound").null_count() == 6
+
+    automatic = prepare_event_table(times_and_reals, time_grid=10)
+    low = times_and_reals.get_column("times").min()
+    high = times_and_reals.get_column("times").max()
+    np.testing.assert_allclose(
+        automatic.get_column("times").to_numpy(),
+        low + (high - low) / 10 * np.array([1, 2, 3, 4, 5, 6, 7, 8, 10]),
+    )
+
+    with pytest.raises(ValueError, match="entry_times"):
+        prepare_event_table(
+            times_and_reals.with_columns(entry=pl.lit(0.0)),
+            entry_times="entry",
+            time_grid=grid,
+        )
+
+
+def test_coarsen_times_on_an_automatic_grid_only_moves_times_up() -> None:
+    rng = np.random.default_rng(24)
+    for _ in range(500):
+        low = rng.uniform(-500, 500)
+        high = low + rng.uniform(0, 200)
+        n_points = int(rng.integers(1, 60))
+        times = np.r_[low, high, rng.uniform(low, high, 20)]
+
+        coarsened = (
+            coarsen_times(pl.DataFrame({"times": times}), n_points)
+            .get_column("times")
+            .to_numpy()
+        )
+
+        assert np.all(coarsened >= times)
+        assert coarsened.max() == times.max()
+        assert len(np.unique(coarsened)) <= n_points
@@ -0,0 +1,35 @@
+import numpy as np
+import polars as pl
+
+from polarstate import predict_aj_estimates, prepare_event_table, pseudo_observations
+
+
+def test_pseudo_observations_match_leave_one_out_refits() -> None:
+    rng = np.random.default_rng(12)
+    n = 60
+    times_and_reals = pl.DataFrame(
+        {"times": rng.integers(1, 15, n), "reals": rng.integers(0, 3, n)}
+    )
+    horizons = pl.Series([0, 3, 7, 14, 20])
+
+    result = pseudo_observations(times_and_reals, horizons)
+
+    columns = [f"state_occupancy_probability_{state}" for state in (0, 1, 2)]
+    full = predict_aj_estimates(prepare_event_table(times_and_reals), horizons)
+    expected = []
+    for i in range(n):
+        leave_one_out = predict_aj_estimates(
+            prepare_event_table(
+                times_and_reals.with_row_index().filter(pl.col("index") != i)
+            ),
+            horizons,
+        )
+        expected.append(
+            n * full.select(columns).to_numpy()
+            - (n - 1) * leave_one_out.select(columns).to_numpy()
+        )
+
+    assert result.height == n * len(horizons)
+    np.testing.assert_allclose(
+        result.select(columns).to_numpy(), np.concatenate(expected), atol=1e-12
+    )
@@ -0,0 +1,43 @@
+import numpy as np
+import polars as pl
+
+from polarstate import predict_aj_estimates, prepare_event_table
+from polarstate.restricted_mean import restricted_mean_time
+
+
+def test_restricted_mean_time_integrates_step_functions() -> None:
+    rng = np.random.default_rng(17)
+    n = 200
+    times_and_reals = pl.DataFrame(
+        {
+            "times": rng.integers(1, 40, n),
+            "reals": rng.integers(0, 3, n),
+            "group": rng.integers(0, 2, n),
+        }
+    )
+    horizons = pl.Series([0, 7, 25, 50])
+
+    result = restricted_mean_time(
+        prepare_event_table(times_and_reals, by="group"), horizons, by="group"
+    )
+
+    # Every step of these integer-time curves is constant on [t, t + 1).
+    grid = pl.Series(np.arange(50))
+    estimates = predict_aj_estimates(
+        prepare_event_table(times_and_reals, by="group"), grid, by="group"
+    )
+    for (group,), curve in estimates.partition_by("group", as_dict=True).items():
+        observed = result.filter(pl.col("group") == group)
+        for state, column in (
+            (0, "restricted_mean_survival_time"),
+            (1, "restricted_mean_time_lost_1"),
+            (2, "restricted_mean_time_lost_2"),
+        ):
+            values = curve.get_column(f"state_occupancy_probability_{state}")
+            expected = [values[:horizon].sum() for horizon in horizons]
+            np.testing.assert_allclose(observed.get_column(column), expected)
+
+    np.testing.assert_allclose(
+        result.select(pl.sum_horizontal(pl.exclude("group", "times"))).to_series(),
+        result.get_column("times"),
+    )
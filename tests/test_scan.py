@@ -0,0 +1,21 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from polarstate import prepare_event_table, scan_event_table
+
+
+def test_scan_event_table(tmp_path) -> None:
+    times_and_reals = pl.DataFrame(
+        {
+            "times": [1, 1, 2, 2, 2, 3, 3, 4, 5, 5],
+            "reals": [0, 1, 0, 1, 2, 2, 2, 1, 0, 2],
+        }
+    )
+    for index, batch in enumerate(times_and_reals.iter_slices(4)):
+        batch.write_parquet(tmp_path / f"part-{index}.parquet")
+    times_and_reals.write_csv(tmp_path / "all.csv")
+
+    expected_output = prepare_event_table(times_and_reals)
+
+    assert_frame_equal(scan_event_table(str(tmp_path / "*.parquet")), expected_output)
+    assert_frame_equal(scan_event_table(tmp_path / "all.csv"), expected_output)